@@ -0,0 +1,162 @@
+import math
+import time
+from ai_minimax import evaluate_board, get_possible_actions
+from pokemon_engine import DAMAGE_CACHE
+
+# --- MONTE CARLO TREE SEARCH A MOSSE SIMULTANEE (DECOUPLED UCT) ---
+# Ogni nodo tiene statistiche separate per le azioni dell'IA e per quelle del giocatore:
+# ognuno sceglie con UCB1 sulle proprie, il turno viene risolto con apply_turn (tiri
+# casuali inclusi) e il figlio è indicizzato dalla coppia di azioni. L'albero è
+# "open-loop": lo stato viene ricostruito a ogni iterazione rigiocando le azioni.
+
+EXPLORATION = 1.4
+DEFAULT_PLAYOUTS = 2000
+ROLLOUT_DEPTH = 20        # turni massimi di un rollout prima della valutazione statica
+SCORE_SCALE = 1800        # evaluate_board senza vincitore sta in circa [-900, 900]
+
+class MCTSNode:
+    __slots__ = ('visits', 'ai_stats', 'pl_stats', 'children')
+
+    def __init__(self):
+        self.visits = 0
+        self.ai_stats = {}     # azione -> [visite, ricompensa totale per l'IA]
+        self.pl_stats = {}     # azione -> [visite, ricompensa totale per il giocatore]
+        self.children = {}     # (azione IA, azione giocatore) -> MCTSNode
+
+def _is_over(battle):
+    return all(p.is_fainted() for p in battle.team1) or all(p.is_fainted() for p in battle.team2)
+
+def _reward(battle):
+    """Ricompensa in [0, 1] dal punto di vista dell'IA"""
+    score = evaluate_board(battle)
+    if score >= 100000: return 1.0
+    if score <= -100000: return 0.0
+    return min(1.0, max(0.0, 0.5 + score / SCORE_SCALE))
+
+def _legal_actions(team, active):
+    # Se il Pokemon in campo è esausto l'unica azione sensata è cambiarlo
+    actions = get_possible_actions(team, active)
+    if active.is_fainted():
+        switches = [a for a in actions if a[0] == "SWITCH"]
+        if switches: return switches
+    return actions
+
+def _select(stats, actions, visits, exploration, rng):
+    """UCB1 sulle azioni legali di un lato; le azioni mai provate hanno la precedenza"""
+    untried = [a for a in actions if a not in stats]
+    if untried:
+        return rng.choice(untried)
+    log_n = math.log(max(visits, 1))
+    best_action = actions[0]
+    best_ucb = -math.inf
+    for a in actions:
+        n, w = stats[a]
+        ucb = w / n + exploration * math.sqrt(log_n / n)
+        if ucb > best_ucb:
+            best_ucb = ucb
+            best_action = a
+    return best_action
+
+# --- ROLLOUT ---
+
+def _greedy_action(team, active, opp_active, actions):
+    if active.is_fainted():
+        return actions[0]
+    best_action = actions[0]
+    best_dmg = -1
+    for a in actions:
+        if a[0] == "ATTACK":
+            dmg = DAMAGE_CACHE.get(active, opp_active, active.moves[a[1]])[2]
+            if dmg > best_dmg:
+                best_dmg = dmg
+                best_action = a
+    return best_action
+
+def _rollout(sim, policy, max_turns, deterministic, rng):
+    """Gioca al massimo max_turns turni con la policy data e ritorna la ricompensa; la
+    battaglia viene riportata allo stato iniziale"""
+    undos = []
+    for _ in range(max_turns):
+        if _is_over(sim): break
+        ai_actions = _legal_actions(sim.team2, sim.p2_active)
+        pl_actions = _legal_actions(sim.team1, sim.p1_active)
+        if policy == "greedy":
+            ai_act = _greedy_action(sim.team2, sim.p2_active, sim.p1_active, ai_actions)
+            pl_act = _greedy_action(sim.team1, sim.p1_active, sim.p2_active, pl_actions)
+        else:
+            ai_act = rng.choice(ai_actions)
+            pl_act = rng.choice(pl_actions)
+        undos.append(sim.apply_turn(ai_act, pl_act, deterministic))
+    reward = _reward(sim)
+    for undo in reversed(undos):
+        sim.undo_turn(undo)
+    return reward
+
+# --- ENTRY POINT ---
+
+def get_best_action_mcts(battle, budget_ms=None, playouts=None, rollout="greedy",
+                         rollout_depth=ROLLOUT_DEPTH, exploration=EXPLORATION, deterministic=False, rng=None,
+                         stop=None):
+    """Ritorna l'azione IA più visitata, es: ("ATTACK", 2).
+    Si ferma al primo limite raggiunto tra `budget_ms` (millisecondi) e `playouts`;
+    senza nessuno dei due esegue DEFAULT_PLAYOUTS iterazioni.
+    rollout: "greedy" (miglior danno atteso) oppure "random".
+    rng: RNG per selezione, rollout e tiri dei turni; None usa un RNG derivato da quello
+    della battaglia (vedi Battle.search_copy), così i tiri della partita non cambiano.
+    stop: threading.Event opzionale; se impostato la ricerca finisce all'iterazione successiva."""
+    if budget_ms is None and playouts is None:
+        playouts = DEFAULT_PLAYOUTS
+    deadline = time.perf_counter() + budget_ms / 1000 if budget_ms is not None else None
+
+    root_actions = _legal_actions(battle.team2, battle.p2_active)
+    if not root_actions: return ("ATTACK", 0)
+    if len(root_actions) == 1: return root_actions[0]
+
+    sim = battle.search_copy(rng)
+    rng = sim.rng
+    root = MCTSNode()
+    iterations = 0
+
+    while True:
+        if playouts is not None and iterations >= playouts: break
+        if deadline is not None and time.perf_counter() > deadline: break
+        if stop is not None and stop.is_set(): break
+        iterations += 1
+
+        # 1. Selezione ed espansione
+        node = root
+        path = []
+        undos = []
+        while not _is_over(sim):
+            ai_actions = _legal_actions(sim.team2, sim.p2_active)
+            pl_actions = _legal_actions(sim.team1, sim.p1_active)
+            ai_act = _select(node.ai_stats, ai_actions, node.visits, exploration, rng)
+            pl_act = _select(node.pl_stats, pl_actions, node.visits, exploration, rng)
+            path.append((node, ai_act, pl_act))
+            undos.append(sim.apply_turn(ai_act, pl_act, deterministic))
+
+            child = node.children.get((ai_act, pl_act))
+            if child is None:
+                node.children[(ai_act, pl_act)] = MCTSNode()
+                break
+            node = child
+
+        # 2. Simulazione
+        reward = _rollout(sim, rollout, rollout_depth, deterministic, rng)
+
+        # 3. Retropropagazione (ogni lato aggiorna solo le proprie statistiche)
+        for node, ai_act, pl_act in path:
+            node.visits += 1
+            stats = node.ai_stats.setdefault(ai_act, [0, 0.0])
+            stats[0] += 1
+            stats[1] += reward
+            stats = node.pl_stats.setdefault(pl_act, [0, 0.0])
+            stats[0] += 1
+            stats[1] += 1.0 - reward
+
+        for undo in reversed(undos):
+            sim.undo_turn(undo)
+
+    if not root.ai_stats:
+        return root_actions[0]
+    return max(root.ai_stats.items(), key=lambda item: item[1][0])[0]
@@ -1,8 +1,17 @@
+import atexit
 import copy
+import itertools
 import math
-from pokemon_engine import calculate_damage
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from time import perf_counter_ns
+from pokemon_engine import Battle, make_team, DAMAGE_CACHE
 
 def evaluate_board(battle):
+    """Punteggio dal punto di vista dell'IA (team2)"""
     if all(p.is_fainted() for p in battle.team1): return 100000 
     if all(p.is_fainted() for p in battle.team2): return -100000
 
@@ -36,77 +45,727 @@ def get_possible_actions(team, active_mon):
             
     return actions
 
-def simulate_turn(battle_state, ai_action, player_action):
-    """Simula un turno completo con risoluzione simultanea"""
-    sim = copy.deepcopy(battle_state)
-    
-    # 1. Risolvi Cambi
-    if ai_action[0] == "SWITCH":
-        sim.p2_active = sim.team2[ai_action[1]]
-    if player_action[0] == "SWITCH":
-        sim.p1_active = sim.team1[player_action[1]]
-
-    # 2. Risolvi Attacchi
-    attackers = []
-    if player_action[0] == "ATTACK" and not sim.p1_active.is_fainted():
-        attackers.append((sim.p1_active, sim.p2_active, sim.p1_active.moves[player_action[1]]))
-    if ai_action[0] == "ATTACK" and not sim.p2_active.is_fainted():
-        attackers.append((sim.p2_active, sim.p1_active, sim.p2_active.moves[ai_action[1]]))
-
-    attackers.sort(key=lambda x: x[0].speed, reverse=True)
-
-    for att, defe, move in attackers:
-        if att.is_fainted() or defe.is_fainted(): continue
-        dmg, _ = calculate_damage(att, defe, move)
-        defe.take_damage(dmg)
-
+def simulate_turn(battle_state, ai_action, player_action, deterministic=False, rng=None):
+    """Simula un turno completo con risoluzione simultanea (su una copia).
+    `rng` sostituisce l'RNG della battaglia per i tiri casuali (None: RNG derivato, vedi search_copy)."""
+    sim = battle_state.search_copy(rng)
+    sim.apply_turn(ai_action, player_action, deterministic)
     return sim
 
-def minimax(battle_node, depth, alpha, beta, is_maximizing):
+# --- TABELLA DI TRASPOSIZIONE ---
+# Mosse in ordine diverso e cambi simmetrici portano alla stessa posizione (stessi HP,
+# stessi attivi): la tabella ricorda il valore già calcolato, indicizzato dall'hash Zobrist.
+
+TT_EXACT = 0   # valore esatto
+TT_LOWER = 1   # il valore vero è >= score (taglio beta)
+TT_UPPER = 2   # il valore vero è <= score (nessuna azione ha superato alpha)
+
+class TranspositionTable:
+    """Tabella a indirizzamento diretto (hash % max_entries), circa 150 byte per voce piena.
+    Rimpiazzo: si sovrascrive una voce di un'altra ricerca (generazione più vecchia)
+    oppure una voce della ricerca corrente con profondità minore o uguale."""
+    def __init__(self, max_entries=1 << 16):
+        self.max_entries = max_entries
+        self.slots = [None] * max_entries
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.rejected = 0
+
+    def new_search(self):
+        """Da chiamare a ogni decisione: le voci vecchie diventano rimpiazzabili"""
+        self.generation += 1
+
+    def probe(self, key):
+        self.probes += 1
+        entry = self.slots[key % self.max_entries]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, best_action=None):
+        idx = key % self.max_entries
+        old = self.slots[idx]
+        if old is not None:
+            if old[5] == self.generation and old[1] > depth:
+                self.rejected += 1
+                return
+            if old[0] != key:
+                self.overwrites += 1
+        self.slots[idx] = (key, depth, score, flag, best_action, self.generation)
+        self.stores += 1
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def clear(self):
+        self.slots = [None] * self.max_entries
+        self.probes = self.hits = self.stores = self.overwrites = self.rejected = 0
+
+    def __repr__(self):
+        return (f"TranspositionTable(max_entries={self.max_entries}, probes={self.probes}, "
+                f"hits={self.hits}, hit_rate={self.hit_rate():.1%}, overwrites={self.overwrites})")
+
+class SearchTimeout(Exception):
+    """Budget di tempo esaurito: la profondità in corso viene scartata"""
+    pass
+
+class SearchStats:
+    """Statistiche di una decisione (opt-in, vedi stats=True in get_best_action_minimax).
+    I tempi per fase sono in nanosecondi e non si sovrappongono: copia della battaglia,
+    generazione/ordinamento delle azioni, risoluzione dei turni (apply/undo esclusi i danni),
+    calcolo dei danni (calculate_damage dentro apply_turn) e valutazione delle foglie;
+    "other" è il resto (tabella, alpha-beta, overhead).
+    Con la radice parallela i tempi per fase e i contatori delle cache vedono solo il
+    processo principale; nodi, foglie e tagli includono quelli dei worker."""
+    PHASES = ("copy", "actions", "turns", "damage", "eval")
+
+    def __init__(self):
+        self.decisions = 0
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.pruned_actions = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.damage_hits = 0
+        self.damage_misses = 0
+        self.max_depth = 0
+        self.total_ns = 0
+        self.phase_ns = dict.fromkeys(self.PHASES, 0)
+
+    def phase_time(self, phase):
+        """Tempo in ns di una fase; "other" è il tempo non attribuito a nessuna fase"""
+        if phase == "other":
+            return max(0, self.total_ns - sum(self.phase_ns.values()))
+        return self.phase_ns[phase]
+
+    def add(self, other):
+        """Somma le statistiche di un'altra decisione (es. per una partita intera)"""
+        self.decisions += other.decisions
+        self.nodes += other.nodes
+        self.leaves += other.leaves
+        self.cutoffs += other.cutoffs
+        self.pruned_actions += other.pruned_actions
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.damage_hits += other.damage_hits
+        self.damage_misses += other.damage_misses
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.total_ns += other.total_ns
+        for phase in self.PHASES:
+            self.phase_ns[phase] += other.phase_ns[phase]
+
+    def as_row(self, prefix="Minimax_"):
+        """Colonne per il CSV: medie per decisione, tempi in millisecondi"""
+        n = self.decisions or 1
+        damage_total = self.damage_hits + self.damage_misses
+        row = {
+            f"{prefix}Avg_Nodes": round(self.nodes / n, 1),
+            f"{prefix}Avg_Leaves": round(self.leaves / n, 1),
+            f"{prefix}Avg_Cutoffs": round(self.cutoffs / n, 1),
+            f"{prefix}Avg_Pruned_Actions": round(self.pruned_actions / n, 1),
+            f"{prefix}Max_Depth": self.max_depth,
+            f"{prefix}TT_Hits": self.tt_hits,
+            f"{prefix}Damage_Cache_Hit_Rate": round(self.damage_hits / damage_total, 4) if damage_total else 0.0,
+        }
+        for phase in self.PHASES + ("other",):
+            row[f"{prefix}Avg_{phase.capitalize()}_ms"] = round(self.phase_time(phase) / n / 1e6, 4)
+        return row
+
+    def __repr__(self):
+        phases = ", ".join(f"{p}={self.phase_time(p) / 1e6:.2f}ms" for p in self.PHASES + ("other",))
+        return (f"SearchStats(decisions={self.decisions}, nodes={self.nodes}, leaves={self.leaves}, "
+                f"cutoffs={self.cutoffs}, tt_hits={self.tt_hits}/{self.tt_probes}, "
+                f"damage_hits={self.damage_hits}/{self.damage_hits + self.damage_misses}, "
+                f"max_depth={self.max_depth}, total={self.total_ns / 1e6:.2f}ms, {phases})")
+
+class SearchContext:
+    """Parametri e contatori condivisi da tutti i nodi di una ricerca.
+    prune=False disattiva i tagli alpha-beta (ricerca completa, utile per i confronti);
+    ordering attiva l'ordinamento delle azioni, prune_dominated l'eliminazione delle dominate.
+    stop: threading.Event opzionale, se impostato interrompe la ricerca come un timeout.
+    stats: SearchStats opzionale in cui accumulare i tempi per fase (None = nessuna misura)."""
+    def __init__(self, deterministic=True, tt=None, deadline=None, prune=True,
+                 ordering=True, prune_dominated=True, stop=None, stats=None):
+        self.deterministic = deterministic
+        self.tt = tt
+        self.deadline = deadline
+        self.stop = stop
+        self.stats = stats
+        self.prune = prune
+        self.ordering = ordering
+        self.prune_dominated = prune_dominated
+        self.nodes = 0      # posizioni (inizio turno) visitate
+        self.leaves = 0     # chiamate a evaluate_board
+        self.cutoffs = 0    # tagli alpha-beta
+        self.pruned_actions = 0
+        # Euristiche killer/history, separate per IA (True) e giocatore (False)
+        self.killers = {}                       # (is_ai, depth) -> [azione, azione]
+        self.history = {True: {}, False: {}}    # is_ai -> {azione: punteggio}
+        # Cache locali alla ricerca per le dominanze
+        self.dominated_moves = {}
+        self.matchups = {}
+
+    def record_cutoff(self, is_ai, depth, action):
+        self.cutoffs += 1
+        if not self.ordering: return
+        killers = self.killers.setdefault((is_ai, depth), [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        history = self.history[is_ai]
+        history[action] = history.get(action, 0) + depth * depth
+
+# --- ORDINAMENTO E RIDUZIONE DELLE AZIONI ---
+
+def _expected(attacker, defender, move):
+    return DAMAGE_CACHE.get(attacker, defender, move)[2]
+
+def _dominated_move_indices(ctx, attacker, opp_team):
+    """Indici delle mosse dominate: un'altra mossa fa almeno lo stesso danno atteso
+    contro ogni avversario ancora in vita (chiunque entri in campo questo turno)"""
+    targets = tuple(p for p in opp_team if not p.is_fainted())
+    key = (id(attacker), targets)
+    cached = ctx.dominated_moves.get(key)
+    if cached is not None:
+        return cached
+
+    moves = attacker.moves
+    damage = [[_expected(attacker, t, m) for t in targets] for m in moves]
+    dominated = set()
+    for i in range(len(moves)):
+        for j in range(len(moves)):
+            if i == j or j in dominated: continue
+            if all(dj >= di for dj, di in zip(damage[j], damage[i])):
+                # A parità esatta si tiene la mossa con indice minore
+                if damage[j] != damage[i] or j < i:
+                    dominated.add(i)
+                    break
+    ctx.dominated_moves[key] = dominated
+    return dominated
+
+def _matchup(ctx, mon, opp_active):
+    """(miglior danno atteso inflitto, miglior danno atteso subito) contro l'avversario in campo"""
+    key = (id(mon), id(opp_active))
+    cached = ctx.matchups.get(key)
+    if cached is None:
+        dealt = max((_expected(mon, opp_active, m) for m in mon.moves), default=0)
+        taken = max((_expected(opp_active, mon, m) for m in opp_active.moves), default=0)
+        cached = ctx.matchups[key] = (dealt, taken)
+    return cached
+
+def remove_dominated_actions(ctx, actions, team, active, opp_team, opp_active):
+    """Toglie le mosse dominate e i cambi verso Pokemon strettamente peggiori di un altro
+    in panchina (meno HP, meno danno inflitto, più danno subito, più lento)"""
+    dominated = _dominated_move_indices(ctx, active, opp_team)
+
+    candidates = []
+    for act in actions:
+        if act[0] == "SWITCH":
+            mon = team[act[1]]
+            dealt, taken = _matchup(ctx, mon, opp_active)
+            candidates.append((act, (mon.current_hp, dealt, -taken, mon.speed)))
+
+    worse = set()
+    for act, feats in candidates:
+        for other, other_feats in candidates:
+            if other != act and other_feats != feats and all(o >= f for o, f in zip(other_feats, feats)):
+                worse.add(act)
+                break
+
+    kept = [a for a in actions
+            if not (a[0] == "ATTACK" and a[1] in dominated) and a not in worse]
+    ctx.pruned_actions += len(actions) - len(kept)
+    return kept
+
+def get_search_actions(battle, is_ai, ctx, depth, tt_best=None):
+    """Azioni di un lato per la ricerca: senza dominate e ordinate
+    (mossa della tabella, killer, history, danno atteso)"""
+    if ctx.stats is not None:
+        start = perf_counter_ns()
+        actions = _search_actions(battle, is_ai, ctx, depth, tt_best)
+        ctx.stats.phase_ns["actions"] += perf_counter_ns() - start
+        return actions
+    return _search_actions(battle, is_ai, ctx, depth, tt_best)
+
+def _search_actions(battle, is_ai, ctx, depth, tt_best):
+    if is_ai:
+        team, active, opp_team, opp_active = battle.team2, battle.p2_active, battle.team1, battle.p1_active
+    else:
+        team, active, opp_team, opp_active = battle.team1, battle.p1_active, battle.team2, battle.p2_active
+
+    actions = get_possible_actions(team, active)
+    if ctx.prune_dominated:
+        actions = remove_dominated_actions(ctx, actions, team, active, opp_team, opp_active)
+    if not ctx.ordering:
+        return actions
+
+    killers = ctx.killers.get((is_ai, depth), ())
+    history = ctx.history[is_ai]
+
+    def priority(act):
+        if act == tt_best: rank = 2
+        elif act in killers: rank = 1
+        else: rank = 0
+        if act[0] == "ATTACK":
+            dmg = _expected(active, opp_active, active.moves[act[1]])
+        else:
+            dmg = -1
+        return (rank, history.get(act, 0), dmg)
+
+    actions.sort(key=priority, reverse=True)
+    return actions
+
+# --- RICERCA A MOSSE SIMULTANEE ---
+# Il turno simultaneo viene sequenzializzato in due semi-mosse: l'IA (MAX) sceglie,
+# poi il giocatore (MIN) risponde conoscendo la scelta (ipotesi pessimistica per l'IA),
+# e solo allora il turno viene risolto con apply_turn. Entrambe le semi-mosse hanno
+# la loro finestra alpha-beta, così le risposte già confutate vengono tagliate.
+
+def minimax(battle_node, depth, alpha, beta, is_maximizing=True, ctx=None, ai_action=None):
+    """Valore della posizione per l'IA.
+    is_maximizing=True: nodo di inizio turno (sceglie l'IA).
+    is_maximizing=False: risposta del giocatore all'azione `ai_action` già scelta."""
+    if ctx is None:
+        ctx = SearchContext()
+    if not is_maximizing:
+        pl_actions = get_search_actions(battle_node, False, ctx, depth)
+        return _min_reply(battle_node, ai_action, pl_actions, depth, alpha, beta, ctx)
+
+    ctx.nodes += 1
+    if ctx.deadline is not None and time.perf_counter() > ctx.deadline:
+        raise SearchTimeout()
+    if ctx.stop is not None and ctx.stop.is_set():
+        raise SearchTimeout()
     if depth == 0 or all(p.is_fainted() for p in battle_node.team1) or all(p.is_fainted() for p in battle_node.team2):
+        ctx.leaves += 1
+        if ctx.stats is not None:
+            start = perf_counter_ns()
+            score = evaluate_board(battle_node)
+            ctx.stats.phase_ns["eval"] += perf_counter_ns() - start
+            return score
         return evaluate_board(battle_node)
 
-    if is_maximizing:
-        max_eval = -math.inf
-        ai_actions = get_possible_actions(battle_node.team2, battle_node.p2_active)
-        pl_actions = get_possible_actions(battle_node.team1, battle_node.p1_active)
-        
-        for ai_act in ai_actions:
-            worst_outcome = math.inf
-            for pl_act in pl_actions:
-                sim_state = simulate_turn(battle_node, ai_act, pl_act)
-                eval_score = minimax(sim_state, depth - 1, alpha, beta, True) 
-                worst_outcome = min(worst_outcome, eval_score)
-            
-            max_eval = max(max_eval, worst_outcome)
+    tt = ctx.tt
+    alpha_orig = alpha
+    tt_best = None
+    if tt is not None:
+        entry = tt.probe(battle_node.hash)
+        if entry is not None:
+            tt_best = entry[4]
+            if entry[1] >= depth:
+                score, flag = entry[2], entry[3]
+                if flag == TT_EXACT: return score
+                if flag == TT_LOWER and score >= beta: return score
+                if flag == TT_UPPER and score <= alpha: return score
+
+    max_eval = -math.inf
+    best_act = None
+    ai_actions = get_search_actions(battle_node, True, ctx, depth, tt_best)
+    pl_actions = get_search_actions(battle_node, False, ctx, depth)
+
+    for ai_act in ai_actions:
+        value = _min_reply(battle_node, ai_act, pl_actions, depth, alpha, beta, ctx)
+        if value > max_eval:
+            max_eval = value
+            best_act = ai_act
+        if ctx.prune:
             alpha = max(alpha, max_eval)
-            if beta <= alpha: break
-                
-        return max_eval
+            if alpha >= beta:
+                ctx.record_cutoff(True, depth, ai_act)
+                break
 
-def get_best_action_minimax(battle_state, depth=2):
-    """Ritorna la tupla migliore per l'IA, es: ("SWITCH", 3)"""
-    best_action = ("ATTACK", 0)
-    best_value = -math.inf
-    alpha = -math.inf
-    beta = math.inf
-    
-    ai_actions = get_possible_actions(battle_state.team2, battle_state.p2_active)
-    pl_actions = get_possible_actions(battle_state.team1, battle_state.p1_active)
+    if tt is not None:
+        if max_eval <= alpha_orig: flag = TT_UPPER
+        elif max_eval >= beta: flag = TT_LOWER
+        else: flag = TT_EXACT
+        tt.store(battle_node.hash, depth, max_eval, flag, best_act)
+
+    return max_eval
 
-    if not ai_actions: return best_action
+def _min_reply(battle_node, ai_act, pl_actions, depth, alpha, beta, ctx):
+    """Semi-mossa MIN: la risposta peggiore (per l'IA) all'azione ai_act"""
+    min_eval = math.inf
+    stats = ctx.stats
+    for pl_act in pl_actions:
+        if stats is None:
+            undo = battle_node.apply_turn(ai_act, pl_act, ctx.deterministic)
+            value = minimax(battle_node, depth - 1, alpha, beta, True, ctx)
+            battle_node.undo_turn(undo)
+        else:
+            # Il tempo dei danni va in "damage" e si toglie da quello del turno
+            damage_ns = stats.phase_ns["damage"]
+            start = perf_counter_ns()
+            undo = battle_node.apply_turn(ai_act, pl_act, ctx.deterministic, stats.phase_ns)
+            stats.phase_ns["turns"] += perf_counter_ns() - start - (stats.phase_ns["damage"] - damage_ns)
+            value = minimax(battle_node, depth - 1, alpha, beta, True, ctx)
+            start = perf_counter_ns()
+            battle_node.undo_turn(undo)
+            stats.phase_ns["turns"] += perf_counter_ns() - start
+        if value < min_eval:
+            min_eval = value
+        if ctx.prune:
+            beta = min(beta, min_eval)
+            if alpha >= beta:
+                ctx.record_cutoff(False, depth, pl_act)
+                break
+    return min_eval
 
+def _search_root(sim, depth, ctx):
+    """Valuta ogni azione IA alla profondità data; ritorna (azione migliore, valore).
+    Il risultato va nella tabella, così la profondità successiva parte dalla stessa azione."""
+    tt_best = None
+    if ctx.tt is not None:
+        entry = ctx.tt.probe(sim.hash)
+        if entry is not None:
+            tt_best = entry[4]
+    ai_actions = get_search_actions(sim, True, ctx, depth, tt_best)
+    pl_actions = get_search_actions(sim, False, ctx, depth)
+
+    best_action = ai_actions[0]
+    best_value = -math.inf
     for ai_act in ai_actions:
-        worst_case = math.inf
-        
-        for pl_act in pl_actions:
-            sim_state = simulate_turn(battle_state, ai_act, pl_act)
-            score = minimax(sim_state, depth - 1, alpha, beta, True)
-            if score < worst_case:
-                worst_case = score
-        
-        if worst_case > best_value:
-            best_value = worst_case
+        alpha = best_value if ctx.prune else -math.inf
+        value = _min_reply(sim, ai_act, pl_actions, depth, alpha, math.inf, ctx)
+        if value > best_value:
+            best_value = value
             best_action = ai_act
-            
-    return best_action
\ No newline at end of file
+
+    if ctx.tt is not None:
+        ctx.tt.store(sim.hash, depth, best_value, TT_EXACT, best_action)
+    return best_action, best_value
+
+# --- RICERCA PARALLELA ALLA RADICE ---
+# I sottoalberi delle azioni IA alla radice sono indipendenti: ognuno va a un worker.
+# I worker condividono il miglior valore trovato finora (alpha della radice), che
+# ogni nuovo sottoalbero usa come finestra iniziale. Ogni ricerca ha un id e il proprio
+# slot di alpha: i task di ricerche concorrenti (più sessioni della GUI) o annullate
+# (pondering) non leggono né scrivono l'alpha di un'altra posizione.
+# Finita o annullata la ricerca, lo slot viene liberato: i task ancora in corso lo vedono
+# al primo nodo (come un `stop`) e terminano subito invece di occupare i worker.
+# Ogni worker tiene una sua tabella di trasposizione tra un task e l'altro: la tabella
+# passata alla ricerca riceve solo la voce della radice.
+# Il task non contiene la battaglia intera (con le chiavi Zobrist) ma solo le specie e lo
+# stato compatto: il worker ricostruisce la battaglia una volta per sfida e poi la riporta
+# alla posizione richiesta con load_state.
+# C'è un pool per numero di worker, creato sotto lock e mai chiuso mentre si cerca: una
+# sessione che chiede un numero diverso di worker non interrompe le ricerche delle altre.
+
+ROOT_ALPHA_SLOTS = 64          # ricerche parallele contemporanee con alpha condivisa
+WORKER_TT_ENTRIES = 1 << 16
+WORKER_BATTLES = 8             # sfide (coppie di squadre) tenute in cache da ogni worker
+STOP_POLL_S = 0.05             # ogni quanto la radice parallela controlla `stop`
+
+_ROOT_POOLS = {}               # numero di worker -> executor
+_ROOT_POOLS_LOCK = threading.Lock()
+_ROOT_ALPHA = None             # Array('d'): alpha per slot, condiviso da tutti i pool
+_ROOT_OWNER = None             # Array('q'): id della ricerca che possiede lo slot
+_SEARCH_IDS = itertools.count(1)
+_SEARCH_IDS_LOCK = threading.Lock()
+_WORKER_LOCAL = threading.local()
+
+def _use_threads():
+    """Thread solo sulle build free-threaded (senza GIL), altrimenti processi"""
+    return hasattr(sys, "_is_gil_enabled") and not sys._is_gil_enabled()
+
+def _init_root_worker(shared_alpha, owners):
+    global _ROOT_ALPHA, _ROOT_OWNER
+    _ROOT_ALPHA = shared_alpha
+    _ROOT_OWNER = owners
+
+def _get_root_pool(workers):
+    global _ROOT_ALPHA, _ROOT_OWNER
+    with _ROOT_POOLS_LOCK:
+        if _ROOT_ALPHA is None:
+            # Un solo lock (quello di alpha) protegge entrambi gli array
+            _ROOT_ALPHA = multiprocessing.Array('d', [-math.inf] * ROOT_ALPHA_SLOTS)
+            _ROOT_OWNER = multiprocessing.Array('q', ROOT_ALPHA_SLOTS, lock=False)
+        pool = _ROOT_POOLS.get(workers)
+        if pool is None:
+            executor = ThreadPoolExecutor if _use_threads() else ProcessPoolExecutor
+            pool = _ROOT_POOLS[workers] = executor(max_workers=workers, initializer=_init_root_worker,
+                                                   initargs=(_ROOT_ALPHA, _ROOT_OWNER))
+        return pool
+
+def shutdown_root_pool():
+    """Chiude tutti i pool (all'uscita). Le ricerche ancora in corso ripiegano sulla seriale."""
+    with _ROOT_POOLS_LOCK:
+        pools = list(_ROOT_POOLS.values())
+        _ROOT_POOLS.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+atexit.register(shutdown_root_pool)
+
+def _claim_root_alpha():
+    """Nuovo id di ricerca e il suo slot, con alpha a -inf: i task ancora in corso di
+    una ricerca precedente sullo stesso slot diventano obsoleti"""
+    with _SEARCH_IDS_LOCK:
+        search_id = next(_SEARCH_IDS)
+    slot = search_id % ROOT_ALPHA_SLOTS
+    with _ROOT_ALPHA.get_lock():
+        _ROOT_OWNER[slot] = search_id
+        _ROOT_ALPHA[slot] = -math.inf
+    return search_id, slot
+
+def _release_root_alpha(search_id, slot):
+    """Libera lo slot: i task rimasti della ricerca diventano obsoleti"""
+    with _ROOT_ALPHA.get_lock():
+        if _ROOT_OWNER[slot] == search_id:
+            _ROOT_OWNER[slot] = 0
+
+class _RootStop:
+    """`stop` dei task della radice: scatta quando la ricerca non possiede più il suo slot
+    (annullata, terminata o slot riassegnato)"""
+    __slots__ = ("search_id", "slot")
+
+    def __init__(self, search_id, slot):
+        self.search_id = search_id
+        self.slot = slot
+
+    def is_set(self):
+        return _ROOT_OWNER[self.slot] != self.search_id
+
+def _read_root_alpha(search_id, slot):
+    with _ROOT_ALPHA.get_lock():
+        if _ROOT_OWNER[slot] != search_id:
+            return -math.inf   # slot riassegnato: nessuna finestra (valore esatto, sempre corretto)
+        return _ROOT_ALPHA[slot]
+
+def _raise_root_alpha(search_id, slot, value):
+    with _ROOT_ALPHA.get_lock():
+        if _ROOT_OWNER[slot] == search_id and value > _ROOT_ALPHA[slot]:
+            _ROOT_ALPHA[slot] = value
+
+def _worker_tt(search_id):
+    """Tabella propria del worker (o del thread), riusata tra i task; nuova generazione
+    a ogni nuova ricerca"""
+    tt = getattr(_WORKER_LOCAL, "tt", None)
+    if tt is None:
+        tt = _WORKER_LOCAL.tt = TranspositionTable(WORKER_TT_ENTRIES)
+        _WORKER_LOCAL.search_id = None
+    if _WORKER_LOCAL.search_id != search_id:
+        tt.new_search()
+        _WORKER_LOCAL.search_id = search_id
+    return tt
+
+def _worker_battle(species, state, rng):
+    """Battaglia del worker (o del thread) per la sfida `species`, portata allo stato compatto
+    `state`. Squadre e chiavi Zobrist si costruiscono una volta per sfida."""
+    battles = getattr(_WORKER_LOCAL, "battles", None)
+    if battles is None:
+        battles = _WORKER_LOCAL.battles = {}
+    # Dopo il pickle le specie sono oggetti nuovi: la chiave usa id e moveset
+    key = tuple(tuple((s.id, tuple(m.name for m in s.moves)) for s in team) for team in species)
+    battle = battles.get(key)
+    if battle is None:
+        if len(battles) >= WORKER_BATTLES:
+            del battles[next(iter(battles))]
+        battle = battles[key] = Battle(make_team(species[0]), make_team(species[1]))
+        battle.enable_hashing()
+    # Anche dopo un SearchTimeout a metà turno load_state riscrive tutta la posizione
+    battle.load_state(state)
+    battle.hash = battle.zobrist.compute_hash(battle)
+    # Con i thread l'RNG arriva per riferimento: ogni task ne usa una copia, come col pickle
+    battle.rng = copy.deepcopy(rng) if _use_threads() else rng
+    return battle
+
+def _search_root_action(species, state, rng, ai_act, depth, deterministic, deadline, search_id, slot):
+    """Eseguita da un worker: (valore di ai_act, alpha usata, (nodi, foglie, tagli))
+    oppure None se scade il tempo"""
+    sim = _worker_battle(species, state, rng)
+    ctx = SearchContext(deterministic, _worker_tt(search_id), deadline, stop=_RootStop(search_id, slot))
+    if ctx.stop.is_set():
+        return None
+    pl_actions = get_search_actions(sim, False, ctx, depth)
+    alpha = _read_root_alpha(search_id, slot)
+    try:
+        value = _min_reply(sim, ai_act, pl_actions, depth, alpha, math.inf, ctx)
+    except SearchTimeout:
+        return None
+    _raise_root_alpha(search_id, slot, value)
+    return value, alpha, (ctx.nodes, ctx.leaves, ctx.cutoffs)
+
+def _search_root_parallel(sim, depth, ctx, workers):
+    """Come _search_root, con un task per azione IA distribuito su `workers` worker"""
+    tt_best = None
+    if ctx.tt is not None:
+        entry = ctx.tt.probe(sim.hash)
+        if entry is not None:
+            tt_best = entry[4]
+    ai_actions = get_search_actions(sim, True, ctx, depth, tt_best)
+
+    pool = _get_root_pool(workers)
+    search_id, slot = _claim_root_alpha()
+    species = (tuple(p.species for p in sim.team1), tuple(p.species for p in sim.team2))
+    state = sim.to_state()
+    futures = []
+    try:
+        for ai_act in ai_actions:
+            futures.append(pool.submit(_search_root_action, species, state, sim.rng, ai_act, depth,
+                                       ctx.deterministic, ctx.deadline, search_id, slot))
+        results = []
+        for future in futures:
+            if ctx.stop is not None:
+                # I worker non vedono `stop`: si controlla mentre si aspetta, così chi ha annullato
+                # la ricerca non resta in attesa dei sottoalberi (i task rimasti diventano obsoleti)
+                while not wait((future,), timeout=STOP_POLL_S).done:
+                    if ctx.stop.is_set():
+                        raise SearchTimeout()
+            result = future.result()
+            if result is None or (ctx.stop is not None and ctx.stop.is_set()):
+                raise SearchTimeout()
+            results.append(result)
+    except (CancelledError, RuntimeError):
+        # Pool chiuso o rotto (uscita, worker morto): la ricerca continua in seriale
+        for f in futures: f.cancel()
+        if ctx.stop is not None and ctx.stop.is_set():
+            raise SearchTimeout()
+        return _search_root(sim, depth, ctx)
+    except SearchTimeout:
+        for f in futures: f.cancel()
+        raise
+    finally:
+        _release_root_alpha(search_id, slot)
+
+    best_key = None
+    best_action = ai_actions[0]
+    best_value = -math.inf
+    for order, (ai_act, result) in enumerate(zip(ai_actions, results)):
+        value, alpha_used, (nodes, leaves, cutoffs) = result
+        ctx.nodes += nodes
+        ctx.leaves += leaves
+        ctx.cutoffs += cutoffs
+        # Un valore <= alpha usata è solo un limite superiore: a parità vince quello esatto,
+        # poi l'ordine delle azioni (come nella ricerca seriale)
+        key = (value, value > alpha_used, -order)
+        if best_key is None or key > best_key:
+            best_key = key
+            best_action = ai_act
+            best_value = value
+
+    if ctx.tt is not None:
+        ctx.tt.store(sim.hash, depth, best_value, TT_EXACT, best_action)
+    return best_action, best_value
+
+def _run_root(sim, depth, ctx, workers):
+    if workers and workers > 1:
+        return _search_root_parallel(sim, depth, ctx, workers)
+    return _search_root(sim, depth, ctx)
+
+def _start_stats(tt):
+    """Apre le statistiche di una decisione: i contatori di tabella e cache sono globali,
+    quindi si salvano i valori iniziali e a fine ricerca si tiene la differenza"""
+    stats = SearchStats()
+    stats.decisions = 1
+    return stats, (perf_counter_ns(), tt.probes, tt.hits, DAMAGE_CACHE.hits, DAMAGE_CACHE.misses)
+
+def _finish_stats(stats, start, ctx, tt, depth):
+    start_ns, tt_probes, tt_hits, damage_hits, damage_misses = start
+    stats.total_ns = perf_counter_ns() - start_ns
+    stats.nodes = ctx.nodes
+    stats.leaves = ctx.leaves
+    stats.cutoffs = ctx.cutoffs
+    stats.pruned_actions = ctx.pruned_actions
+    stats.tt_probes = tt.probes - tt_probes
+    stats.tt_hits = tt.hits - tt_hits
+    stats.damage_hits = DAMAGE_CACHE.hits - damage_hits
+    stats.damage_misses = DAMAGE_CACHE.misses - damage_misses
+    stats.max_depth = depth
+    return stats
+
+def get_best_action_minimax(battle_state, depth=2, deterministic=True, tt=None, budget_ms=None, workers=1, rng=None,
+                            stats=False):
+    """Ritorna la tupla migliore per l'IA, es: ("SWITCH", 3).
+    Con deterministic=True (default) i nodi usano il danno atteso invece dei tiri casuali,
+    quindi la stessa posizione dà sempre la stessa decisione.
+    `tt` è una TranspositionTable da riusare tra le decisioni della stessa battaglia;
+    se None se ne crea una nuova per questa decisione.
+    Con `budget_ms` la ricerca diventa iterativa e `depth` è la profondità massima.
+    Con `workers` > 1 le azioni alla radice vengono valutate in parallelo; i sottoalberi
+    usano la tabella di ciascun worker e in `tt` finisce solo la voce della radice.
+    `rng` serve solo con deterministic=False; None usa un RNG derivato da quello della battaglia.
+    Con stats=True ritorna (azione, SearchStats)."""
+    if budget_ms is not None:
+        result = search_iterative(battle_state, budget_ms, depth, deterministic, tt, workers, rng, stats=stats)
+        return (result[0], result[2]) if stats else result[0]
+
+    ai_actions = get_possible_actions(battle_state.team2, battle_state.p2_active)
+    if not ai_actions:
+        return (("ATTACK", 0), SearchStats()) if stats else ("ATTACK", 0)
+
+    if tt is None:
+        tt = TranspositionTable()
+    search_stats = start = None
+    if stats:
+        search_stats, start = _start_stats(tt)
+
+    # Un'unica copia per decisione: i nodi interni usano apply_turn/undo_turn
+    sim = battle_state.search_copy(rng)
+    sim.enable_hashing()
+    if stats:
+        search_stats.phase_ns["copy"] = perf_counter_ns() - start[0]
+    tt.new_search()
+
+    ctx = SearchContext(deterministic, tt, stats=search_stats)
+    action = _run_root(sim, depth, ctx, workers)[0]
+    if stats:
+        return action, _finish_stats(search_stats, start, ctx, tt, depth)
+    return action
+
+# --- RICERCA ITERATIVA A TEMPO (ANYTIME) ---
+MAX_ITERATIVE_DEPTH = 8
+
+def search_iterative(battle_state, budget_ms, max_depth=MAX_ITERATIVE_DEPTH, deterministic=True, tt=None, workers=1,
+                     rng=None, stop=None, on_depth=None, stats=False):
+    """Approfondisce 1, 2, 3... finché resta tempo nel budget (millisecondi).
+    Ritorna (azione migliore dell'ultima profondità completata, profondità raggiunta);
+    con stats=True ritorna (azione, profondità, SearchStats).
+    La profondità 1 viene sempre completata, anche oltre il budget.
+    budget_ms=None: nessun limite di tempo (fino a max_depth o finché `stop` non viene impostato).
+    on_depth(azione, profondità) viene chiamata a ogni profondità completata."""
+    start_time = time.perf_counter()
+    deadline = start_time + budget_ms / 1000 if budget_ms is not None else None
+
+    ai_actions = get_possible_actions(battle_state.team2, battle_state.p2_active)
+    if not ai_actions:
+        return (("ATTACK", 0), 0, SearchStats()) if stats else (("ATTACK", 0), 0)
+
+    if tt is None:
+        tt = TranspositionTable()
+    search_stats = start = None
+    if stats:
+        search_stats, start = _start_stats(tt)
+
+    sim = battle_state.search_copy(rng)
+    sim.enable_hashing()
+    if stats:
+        search_stats.phase_ns["copy"] = perf_counter_ns() - start[0]
+    tt.new_search()
+    ctx = SearchContext(deterministic, tt, stop=stop, stats=search_stats)
+
+    best_action = ai_actions[0]
+    depth_reached = 0
+    for depth in range(1, max_depth + 1):
+        # La migliore azione della profondità precedente arriva dalla tabella e va per prima
+        ctx.deadline = deadline if depth > 1 else None
+        ctx.stop = stop if depth > 1 else None
+        try:
+            action, _ = _run_root(sim, depth, ctx, workers)
+        except SearchTimeout:
+            # La copia è rimasta a metà di un apply_turn: si scarta insieme alla profondità
+            break
+        best_action = action
+        depth_reached = depth
+        if on_depth is not None:
+            on_depth(best_action, depth_reached)
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+
+    if stats:
+        return best_action, depth_reached, _finish_stats(search_stats, start, ctx, tt, depth_reached)
+    return best_action, depth_reached
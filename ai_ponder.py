@@ -0,0 +1,86 @@
+import threading
+import time
+
+# --- RICERCA IN BACKGROUND CON PONDERING ---
+# Le mosse sono simultanee: l'azione dell'IA dipende solo dalla posizione, non da quello
+# che sceglierà il giocatore. Si può quindi cominciare a cercare appena la posizione è
+# nota (mentre l'umano sta ancora scegliendo) e, al click, usare la risposta già pronta
+# se la posizione (chiave) è la stessa. La ricerca gira su un thread legato alla sessione.
+
+class PonderingSearch:
+    """Un thread di ricerca alla volta; l'ultima profondità completata è sempre disponibile"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop = threading.Event()
+        self.key = None
+        self.action = None
+        self.depth = 0
+        self.done = False
+        self.error = None      # eccezione sollevata da search_fn (la ricerca risulta terminata)
+        self.started_at = 0.0
+
+    def start(self, key, search_fn):
+        """Avvia search_fn(on_depth, stop) -> azione per la posizione `key`.
+        Se quella posizione è già in ricerca (o risolta) non fa nulla."""
+        if key == self.key and self.thread is not None:
+            return
+        self.cancel()
+        stop = threading.Event()
+        with self.lock:
+            self.stop = stop
+            self.key = key
+            self.action = None
+            self.depth = 0
+            self.done = False
+            self.error = None
+            self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, args=(search_fn, stop), daemon=True)
+        self.thread.start()
+
+    def _run(self, search_fn, stop):
+        def on_depth(action, depth):
+            with self.lock:
+                if self.stop is stop:
+                    self.action = action
+                    self.depth = depth
+
+        action = error = None
+        try:
+            action = search_fn(on_depth, stop)
+        except Exception as exc:
+            error = exc
+        finally:
+            # done va impostato in ogni caso, altrimenti chi aspetta il risultato resta bloccato.
+            # Una ricerca annullata nel frattempo non sovrascrive quella nuova.
+            with self.lock:
+                if self.stop is stop:
+                    if action is not None:
+                        self.action = action
+                    self.error = error
+                    self.done = True
+
+    def progress(self):
+        """(profondità completata, ricerca terminata, secondi dall'avvio)"""
+        with self.lock:
+            return self.depth, self.done, time.perf_counter() - self.started_at
+
+    def result(self, key):
+        """Azione migliore trovata finora per `key` (None se la chiave è diversa o non c'è ancora nulla)"""
+        with self.lock:
+            return self.action if key == self.key else None
+
+    def failure(self, key):
+        """Eccezione della ricerca per `key` (None se non è fallita)"""
+        with self.lock:
+            return self.error if key == self.key else None
+
+    def cancel(self):
+        """Interrompe la ricerca corrente e aspetta che il thread termini (al prossimo nodo),
+        così non scrive più nella tabella di trasposizione condivisa"""
+        with self.lock:
+            self.stop.set()
+            self.key = None
+        if self.thread is not None:
+            self.thread.join()
+        self.thread = None
@@ -1,13 +1,23 @@
 import streamlit as st
+import io
+import itertools
+import math
 import random
-import copy
 import os
 import time
 import pandas as pd
-from pokemon_engine import load_moves, load_gen1_pokemon, Battle, Pokemon, calculate_damage
-from ai_minimax import get_best_action_minimax  # <-- ATTENZIONE AL NUOVO NOME
+from collections import deque
+from PIL import Image
+from pokemon_engine import (load_moves, Pokedex, Battle, make_team, calculate_damage, ListSink,
+                            PLAYER, EV_SWITCH, EV_MOVE, EV_MISS, EV_EFFECTIVENESS, EV_HIT, EV_FAINT, EV_SEND_OUT)
+from ai_minimax import search_iterative, TranspositionTable  # <-- ATTENZIONE AL NUOVO NOME
+from ai_mcts import get_best_action_mcts
+from ai_ponder import PonderingSearch
 
 st.set_page_config(page_title="Pokémon AI Arena", page_icon="⚡", layout="wide")
+
+LOG_MAX_TURNS = 200        # turni conservati nella cronaca (buffer circolare)
+LOG_TURNS_PER_PAGE = 10
 app_mode = st.sidebar.selectbox("Navigazione App:", ["⚔️ Arena di Combattimento", "📊 Report e Metriche (IA)"])
 st.sidebar.divider()
 
@@ -16,7 +26,69 @@ def get_sprite_path(pokemon_id):
     filename = f"{pokemon_id:03d}MS.png"
     return os.path.join("sprites", filename)
 
-def get_best_action_greedy(battle):
+def file_mtime(path):
+    """mtime del file (None se non esiste): fa parte della chiave delle cache qui sotto"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+# --- RISORSE IN CACHE (condivise da tutte le sessioni del processo) ---
+# Ogni rerun fa solo il lavoro di rendering: dati, sprite e report vengono letti una volta
+# e ricaricati solo quando cambia l'mtime dei file sorgente.
+@st.cache_resource(show_spinner=False)
+def load_game_data(moves_mtime, pokedex_mtime):
+    """Mosse (immutabili, quindi condivisibili tra sessioni). I moveset invece vengono
+    pescati per sessione, vedi l'inizializzazione dell'arena."""
+    return load_moves('moves.json')
+
+@st.cache_resource(show_spinner=False)
+def load_sprite(pokemon_id, width, mtime):
+    """PNG già ridimensionato a `width` px (pixel art: ridimensionamento nearest); None se manca"""
+    if mtime is None:
+        return None
+    with Image.open(get_sprite_path(pokemon_id)) as img:
+        height = max(1, round(img.height * width / img.width))
+        scaled = img.convert("RGBA").resize((width, height), Image.NEAREST)
+    buffer = io.BytesIO()
+    scaled.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def show_sprite(pokemon_id, width):
+    sprite = load_sprite(pokemon_id, width, file_mtime(get_sprite_path(pokemon_id)))
+    if sprite is not None:
+        st.image(sprite, width=width)
+
+@st.cache_data(show_spinner=False)
+def load_report(csv_path, mtime):
+    return pd.read_csv(csv_path)
+
+def format_event(event):
+    """Messaggio della cronaca per un evento di resolve_turn (None = non mostrato)"""
+    kind = event[0]
+    who = "Tu" if event[1] == PLAYER else "AI"
+    if kind == EV_SWITCH:
+        if event[1] == PLAYER: return f"🔄 Hai scambiato con **{event[3].name}**!"
+        return f"🤖 L'IA scambia con **{event[3].name}**!"
+    if kind == EV_MISS:
+        return f"❌ **{who}** ({event[2].name}) usa {event[3].name} ma fallisce!"
+    if kind == EV_MOVE:
+        return f"**{who}** ({event[2].name}) usa {event[3].name}"
+    if kind == EV_EFFECTIVENESS:
+        eff = event[2]
+        if eff > 1: return "-> Super Efficace!"
+        if eff == 0: return "-> Non ha effetto!"
+        return "-> Non molto efficace..."
+    if kind == EV_HIT:
+        return f"-> {event[2].name} subisce {event[3]} danni." if event[3] > 0 else None
+    if kind == EV_FAINT:
+        return f"💀 {event[2].name} è esausto!"
+    if kind == EV_SEND_OUT:
+        if event[1] == PLAYER: return f"⚠️ {event[2].name} entra in campo forzatamente!"
+        return f"⚠️ L'IA manda in campo {event[2].name}!"
+    return None
+
+def get_best_action_greedy(battle, deterministic=False):
     p1 = battle.p1_active # Giocatore (Bersaglio)
     p2 = battle.p2_active # IA (Attaccante)
     
@@ -26,7 +98,7 @@ def get_best_action_greedy(battle):
     # 1. Cerca il miglior attacco del Pokemon in campo
     if p2.moves:
         for i, move in enumerate(p2.moves):
-            dmg, _ = calculate_damage(p2, p1, move)
+            dmg, _ = calculate_damage(p2, p1, move, deterministic, rng=battle.rng)
             if dmg > max_dmg:
                 max_dmg = dmg
                 best_move_idx = i
@@ -40,7 +112,7 @@ def get_best_action_greedy(battle):
         for i, bench_mon in enumerate(battle.team2):
             if bench_mon != p2 and not bench_mon.is_fainted():
                 for move in bench_mon.moves:
-                    b_dmg, _ = calculate_damage(bench_mon, p1, move)
+                    b_dmg, _ = calculate_damage(bench_mon, p1, move, deterministic, rng=battle.rng)
                     if b_dmg > best_bench_dmg:
                         best_bench_dmg = b_dmg
                         best_bench_idx = i
@@ -59,33 +131,57 @@ if app_mode == "⚔️ Arena di Combattimento":
     
     # --- INIZIALIZZAZIONE STATO ---
     if 'battle_system' not in st.session_state:
-        moves_db = load_moves('moves.json')
-        pokedex = load_gen1_pokemon('pokedex.json', moves_db)
+        data_dir = os.path.dirname(os.path.abspath(__file__))
+        moves_db = load_game_data(file_mtime(os.path.join(data_dir, 'moves.json')),
+                                  file_mtime(os.path.join(data_dir, 'pokedex.json')))
+        # Moveset nuovi a ogni sessione (seed proprio): il Pokedex è pigro, quindi si
+        # costruiscono solo le 12 specie estratte
+        st.session_state['seed'] = random.getrandbits(32)
+        pokedex = Pokedex(moves_db, id_range=(1, 151), rng=random.Random(st.session_state['seed']))
+        gen1_ids = list(pokedex.rows_by_id)
         
-        player_team = copy.deepcopy(random.sample(pokedex, 6))
-        ai_team = copy.deepcopy(random.sample(pokedex, 6))
+        player_team = make_team([pokedex[i] for i in random.sample(gen1_ids, 6)])
+        ai_team = make_team([pokedex[i] for i in random.sample(gen1_ids, 6)])
         
         st.session_state['battle_system'] = Battle(player_team, ai_team)
-        st.session_state['logs'] = ["Inizio della battaglia!"]
+        st.session_state['tt'] = TranspositionTable(1 << 18)
+        st.session_state['ponder'] = PonderingSearch()
+        st.session_state['logs'] = deque([["Inizio della battaglia!"]], maxlen=LOG_MAX_TURNS)
+        st.session_state['log_page'] = 0
         st.session_state['game_over'] = False
         st.session_state['turn'] = 1
         st.session_state['winner'] = None
 
     battle = st.session_state['battle_system']
-    p1 = battle.p1_active
-    p2 = battle.p2_active
 
     # --- SIDEBAR ---
     with st.sidebar:
         st.header("⚙️ Impostazioni IA")
-        ai_choice = st.radio("Cervello Avversario:", ("Greedy (Avido)", "Minimax (Intelligente)"))
+        ai_choice = st.radio("Cervello Avversario:", ("Greedy (Avido)", "Minimax (Intelligente)", "MCTS (Monte Carlo)"))
+        mcts_budget_ms = 500
+        minimax_budget_ms = None
+        minimax_workers = 1
+        if ai_choice == "Minimax (Intelligente)":
+            if st.toggle("Ricerca a tempo (anytime)"):
+                minimax_budget_ms = st.slider("Budget per mossa (ms):", 50, 3000, 500, step=50)
+                minimax_depth = st.slider("Profondità massima:", 1, 8, 6)
+            else:
+                minimax_depth = st.slider("Profondità Minimax:", 1, 4, 2)
+            if (os.cpu_count() or 1) > 1:
+                minimax_workers = st.slider("Core per la ricerca (radice parallela):", 1, os.cpu_count(), 1)
+            tt = st.session_state['tt']
+            st.caption(f"Tabella di trasposizione: {tt.hits}/{tt.probes} hit ({tt.hit_rate():.1%})")
+        else:
+            minimax_depth = 2
+        if ai_choice == "MCTS (Monte Carlo)":
+            mcts_budget_ms = st.slider("Budget MCTS per mossa (ms):", 50, 3000, 500, step=50)
         st.divider()
         
         st.subheader("La tua Squadra")
         for p in battle.team1:
             icon = "🔴" if p == battle.p1_active else ("💀" if p.is_fainted() else "🟢")
             with st.expander(f"{icon} {p.name} ({p.current_hp}/{p.max_hp})"):
-                st.image(get_sprite_path(p.id), width=50)
+                show_sprite(p.id, 50)
                 st.caption(f"Tipi: {'/'.join(p.types)}")
         
         st.divider()
@@ -93,29 +189,72 @@ if app_mode == "⚔️ Arena di Combattimento":
         for p in battle.team2:
             icon = "🔴" if p == battle.p2_active else ("💀" if p.is_fainted() else "🟢")
             with st.expander(f"{icon} {p.name} ({p.current_hp}/{p.max_hp})"):
-                st.image(get_sprite_path(p.id), width=50)
+                show_sprite(p.id, 50)
                 st.caption(f"Tipi: {'/'.join(p.types)}")
 
+    # --- PONDERING: L'IA PENSA MENTRE SCEGLI ---
+    # Con mosse simultanee la risposta dell'IA non dipende dalla tua scelta: la ricerca parte
+    # su un thread appena la posizione è nota e al click si usa il risultato già pronto.
+    ponder = st.session_state['ponder']
+    ai_key = (id(battle), battle.to_state(), ai_choice, minimax_depth, minimax_budget_ms, minimax_workers, mcts_budget_ms)
+
+    def make_search_fn():
+        snapshot = battle.search_copy()      # il thread lavora su una copia propria
+        if ai_choice == "MCTS (Monte Carlo)":
+            return lambda on_depth, stop: get_best_action_mcts(snapshot, budget_ms=mcts_budget_ms, stop=stop)
+        tt = st.session_state['tt']
+        return lambda on_depth, stop: search_iterative(snapshot, None, minimax_depth, tt=tt, workers=minimax_workers,
+                                                       stop=stop, on_depth=on_depth)[0]
+
+    if not st.session_state['game_over'] and ai_choice != "Greedy (Avido)":
+        ponder.start(ai_key, make_search_fn())
+
     # --- UI CENTRALE ---
+    # Pannelli interattivi in st.fragment: un'interazione dentro un pannello (es. pagine
+    # della cronaca) riesegue solo quel pannello; gli HP non hanno widget e restano normali.
+    # Un turno risolto cambia tutto e fa un rerun completo, che però ha costo costante:
+    # cronaca limitata e risorse in cache.
     st.title("⚡ Pokémon AI Arena")
     st.caption(f"Turno {st.session_state['turn']} | **{ai_choice}** vs Umano")
 
-    col1, col_center, col2 = st.columns([1, 0.2, 1])
+    # Il pannello si aggiorna da solo (ogni mezzo secondo, senza rieseguire la pagina) solo
+    # mentre la ricerca è in corso; appena finisce un rerun completo ferma il polling
+    pondering = ponder.key == ai_key and not ponder.progress()[1]
 
-    with col1:
-        st.markdown(f"### Tu: **{p1.name}**")
-        if os.path.exists(get_sprite_path(p1.id)): st.image(get_sprite_path(p1.id), width=150)
-        hp_pct = max(0.0, p1.current_hp / p1.max_hp)
-        st.progress(hp_pct, text=f"HP: {p1.current_hp}/{p1.max_hp}")
-        st.info(f"Atk: {p1.attack} | Def: {p1.defense} | SpA: {p1.sp_attack} | SpD: {p1.sp_defense} | Spe: {p1.speed}")
+    @st.fragment(run_every=0.5 if pondering else None)
+    def thinking_panel():
+        if ponder.key != ai_key:
+            return
+        ponder_depth, ponder_done, _ = ponder.progress()
+        if pondering and ponder_done:
+            st.rerun()
+        if ai_choice == "MCTS (Monte Carlo)":
+            st.caption("🧠 L'IA ha già deciso" if ponder_done else "🧠 L'IA sta già pensando...")
+        else:
+            st.caption(f"🧠 L'IA sta già pensando: profondità {ponder_depth} raggiunta" + (" (finito)" if ponder_done else ""))
+
+    def hp_panel():
+        p1 = battle.p1_active
+        p2 = battle.p2_active
+        col1, col_center, col2 = st.columns([1, 0.2, 1])
 
-    with col2:
-        st.markdown(f"### AI: **{p2.name}**")
-        if os.path.exists(get_sprite_path(p2.id)): st.image(get_sprite_path(p2.id), width=150)
-        hp_pct_ai = max(0.0, p2.current_hp / p2.max_hp)
-        st.progress(hp_pct_ai, text=f"HP: {p2.current_hp}/{p2.max_hp}")
-        st.info(f"Atk: {p2.attack} | Def: {p2.defense} | SpA: {p2.sp_attack} | SpD: {p2.sp_defense} | Spe: {p2.speed}")
+        with col1:
+            st.markdown(f"### Tu: **{p1.name}**")
+            show_sprite(p1.id, 150)
+            hp_pct = max(0.0, p1.current_hp / p1.max_hp)
+            st.progress(hp_pct, text=f"HP: {p1.current_hp}/{p1.max_hp}")
+            st.info(f"Atk: {p1.attack} | Def: {p1.defense} | SpA: {p1.sp_attack} | SpD: {p1.sp_defense} | Spe: {p1.speed}")
+
+        with col2:
+            st.markdown(f"### AI: **{p2.name}**")
+            show_sprite(p2.id, 150)
+            hp_pct_ai = max(0.0, p2.current_hp / p2.max_hp)
+            st.progress(hp_pct_ai, text=f"HP: {p2.current_hp}/{p2.max_hp}")
+            st.info(f"Atk: {p2.attack} | Def: {p2.defense} | SpA: {p2.sp_attack} | SpD: {p2.sp_defense} | Spe: {p2.speed}")
 
+    if not st.session_state['game_over'] and ai_choice != "Greedy (Avido)":
+        thinking_panel()
+    hp_panel()
     st.divider()
 
     # --- LOGICA DEL TURNO (RISOLUZIONE SIMULTANEA) ---
@@ -125,85 +264,61 @@ if app_mode == "⚔️ Arena di Combattimento":
         
         player_action = (player_action_type, player_data)
         
-        # 1. L'IA DECIDE LA SUA AZIONE
+        # 1. L'IA DECIDE LA SUA AZIONE (risultato del pondering, se serve si aspetta)
         start_time = time.time()
+        depth_msg = ""
         if ai_choice == "Greedy (Avido)":
             ai_action = get_best_action_greedy(battle)
             ai_algo_name = "Greedy"
         else:
-            ai_action = get_best_action_minimax(battle, depth=2)
-            ai_algo_name = "Minimax"
+            ai_algo_name = "MCTS" if ai_choice == "MCTS (Monte Carlo)" else "Minimax"
+            ponder.start(ai_key, make_search_fn())   # no-op se sta già cercando questa posizione
+            status = st.empty()
+            while True:
+                depth, done, searched_s = ponder.progress()
+                # A tempo: basta una profondità completa e il budget (contando anche il pondering)
+                if done or (minimax_budget_ms is not None and ai_algo_name == "Minimax"
+                            and depth >= 1 and searched_s * 1000 >= minimax_budget_ms):
+                    break
+                status.info(f"⏳ {ai_algo_name} sta pensando... profondità {depth}" if ai_algo_name == "Minimax"
+                            else f"⏳ {ai_algo_name} sta pensando...")
+                time.sleep(0.05)
+            ai_action = ponder.result(ai_key)
+            failure = ponder.failure(ai_key)
+            ponder.cancel()
+            status.empty()
+            if ai_action is None:
+                # Ricerca fallita prima di una risposta: si gioca comunque il turno con la Greedy
+                ai_action = get_best_action_greedy(battle)
+                current_logs.append(f"⚠️ {ai_algo_name} non ha risposto ({failure!r}): mossa scelta dalla Greedy")
+                ai_algo_name = "Greedy"
+                depth_msg = ""
+            if ai_algo_name == "Minimax":
+                depth_msg = f" (profondità {depth}, {searched_s:.2f}s di ricerca)"
         elapsed = time.time() - start_time
-        current_logs.append(f"🧠 {ai_algo_name} ha pensato per {elapsed:.2f}s")
+        current_logs.append(f"🧠 {ai_algo_name} ha risposto in {elapsed:.2f}s{depth_msg}")
         
-        # 2. RISOLUZIONE DEI CAMBI
-        if player_action[0] == "SWITCH":
-            battle.p1_active = battle.team1[player_action[1]]
-            current_logs.append(f"🔄 Hai scambiato con **{battle.p1_active.name}**!")
-            
-        if ai_action[0] == "SWITCH":
-            battle.p2_active = battle.team2[ai_action[1]]
-            current_logs.append(f"🤖 L'IA scambia con **{battle.p2_active.name}**!")
+        # 2. RISOLUZIONE (motore condiviso, eventi raccolti e poi formattati per la cronaca)
+        sink = ListSink()
+        outcome = battle.resolve_turn(player_action, ai_action, sink)
+        current_logs.extend(msg for msg in map(format_event, sink.events) if msg)
+        if outcome == "AI_WINS":
+            st.session_state['winner'] = "AI"
+            st.session_state['game_over'] = True
+        elif outcome == "PLAYER_WINS":
+            st.session_state['winner'] = "PLAYER"
+            st.session_state['game_over'] = True
 
-        # 3. RISOLUZIONE DEGLI ATTACCHI
-        attackers = [] 
-        
-        if player_action[0] == "ATTACK" and not battle.p1_active.is_fainted():
-            move = battle.p1_active.moves[player_action[1]]
-            attackers.append((battle.p1_active, battle.p2_active, move, "Tu"))
-            
-        if ai_action[0] == "ATTACK" and not battle.p2_active.is_fainted():
-            move = battle.p2_active.moves[ai_action[1]]
-            attackers.append((battle.p2_active, battle.p1_active, move, "AI"))
-            
-        attackers.sort(key=lambda x: x[0].speed, reverse=True)
-        
-        for att, defe, move, who in attackers:
-            if att.is_fainted() or defe.is_fainted(): continue
-            
-            dmg, eff = calculate_damage(att, defe, move)
-            
-            if eff == -1.0:
-                current_logs.append(f"❌ **{who}** ({att.name}) usa {move.name} ma fallisce!")
-                continue
-                
-            if eff > 1: eff_msg = " (Super Efficace!)"
-            elif eff == 0: eff_msg = " (Non ha effetto!)"
-            elif eff < 1: eff_msg = " (Non molto efficace...)"
-            else: eff_msg = ""
-            
-            current_logs.append(f"**{who}** ({att.name}) usa {move.name}{eff_msg}")
-            defe.take_damage(dmg)
-            if dmg > 0: current_logs.append(f"-> {defe.name} subisce {dmg} danni.")
-            
-            if defe.is_fainted():
-                current_logs.append(f"💀 {defe.name} è esausto!")
-
-        # 4. GESTIONE KO FORZATI
-        if battle.p1_active.is_fainted():
-            next_p = battle.get_next_pokemon(battle.team1)
-            if next_p:
-                battle.p1_active = next_p
-                current_logs.append(f"⚠️ {battle.p1_active.name} entra in campo forzatamente!")
-            else:
-                st.session_state['winner'] = "AI"
-                st.session_state['game_over'] = True
-
-        if battle.p2_active.is_fainted() and not st.session_state['game_over']:
-            next_p_ai = battle.get_next_pokemon(battle.team2)
-            if next_p_ai:
-                battle.p2_active = next_p_ai
-                current_logs.append(f"⚠️ L'IA manda in campo {next_p_ai.name}!")
-            else:
-                st.session_state['winner'] = "PLAYER"
-                st.session_state['game_over'] = True
-
-        st.session_state['logs'] = current_logs + st.session_state['logs']
+        # Buffer circolare: i turni più vecchi di LOG_MAX_TURNS escono da soli
+        st.session_state['logs'].appendleft(current_logs)
+        st.session_state['log_page'] = 0
         st.session_state['turn'] += 1
-        st.rerun()
+        st.rerun()   # dentro un fragment: rerun dell'intera pagina (cambiano HP, squadre e cronaca)
 
     # --- INTERFACCIA COMANDI ---
-    if not st.session_state['game_over']:
+    @st.fragment
+    def action_panel():
+        p1 = battle.p1_active
         st.subheader("⚔️ Scegli Azione")
         st.markdown("<style>div.stButton > button {height: 80px;}</style>", unsafe_allow_html=True)
             
@@ -222,12 +337,15 @@ if app_mode == "⚔️ Arena di Combattimento":
             for i, member in enumerate(battle.team1):
                 if member != p1 and not member.is_fainted():
                     with bench_cols[displayed_count]:
-                        if os.path.exists(get_sprite_path(member.id)): st.image(get_sprite_path(member.id), width=60)
+                        show_sprite(member.id, 60)
                         if st.button(f"{member.name}", key=f"switch_{i}"):
                             execute_turn("SWITCH", i)
                         st.caption(f"HP: {member.current_hp}")
                     displayed_count += 1
             if displayed_count == 0: st.info("Non hai altri Pokémon disponibili!")
+
+    if not st.session_state['game_over']:
+        action_panel()
     else:
         if st.session_state['winner'] == "PLAYER":
             st.balloons()
@@ -235,14 +353,33 @@ if app_mode == "⚔️ Arena di Combattimento":
         else:
             st.error("💀 SCONFITTA! L'IA ha vinto.")
         if st.button("Riavvia Partita"):
+            st.session_state['ponder'].cancel()
             del st.session_state['battle_system']
             st.rerun()
 
+    # --- CRONACA (paginata, si riesegue da sola quando cambi pagina) ---
+    @st.fragment
+    def log_panel():
+        logs = st.session_state['logs']
+        n_pages = max(1, math.ceil(len(logs) / LOG_TURNS_PER_PAGE))
+        page = min(st.session_state.get('log_page', 0), n_pages - 1)
+
+        head, prev_col, next_col = st.columns([4, 1, 1])
+        head.subheader("📜 Cronaca")
+        # I callback girano prima del rerun del fragment: la pagina mostrata è già quella nuova
+        prev_col.button("◀ Più recenti", disabled=page == 0, key="log_prev",
+                        on_click=st.session_state.__setitem__, args=('log_page', page - 1))
+        next_col.button("Più vecchi ▶", disabled=page >= n_pages - 1, key="log_next",
+                        on_click=st.session_state.__setitem__, args=('log_page', page + 1))
+
+        start = page * LOG_TURNS_PER_PAGE
+        with st.container(height=300):
+            for turn_logs in itertools.islice(logs, start, start + LOG_TURNS_PER_PAGE):
+                st.markdown("  \n".join(turn_logs))
+        st.caption(f"Pagina {page + 1}/{n_pages} · ultimi {LOG_MAX_TURNS} turni conservati")
+
     st.markdown("---")
-    st.subheader("📜 Cronaca")
-    with st.container(height=300):
-        for log in st.session_state['logs']:
-            st.write(log)
+    log_panel()
             
 # ==========================================
 # MODALITÀ 2: REPORT E METRICHE
@@ -255,8 +392,8 @@ elif app_mode == "📊 Report e Metriche (IA)":
     if not os.path.exists(csv_path):
         st.error(f"File {csv_path} non trovato. Esegui prima lo script stress_test.py!")
     else:
-        # Leggiamo i dati
-        df = pd.read_csv(csv_path)
+        # Leggiamo i dati (in cache finché il CSV non cambia)
+        df = load_report(csv_path, file_mtime(csv_path))
         
         # --- AGENTE CONVERSAZIONALE (Testo generato sui dati) ---
         st.subheader("🤖 Agente Conversazionale: Sintesi Risultati")
@@ -311,7 +448,67 @@ elif app_mode == "📊 Report e Metriche (IA)":
             # Raggruppiamo i dati per capire chi vince con che squadra
             team_wins = df.groupby(['Team_Type', 'Winner']).size().unstack(fill_value=0)
             st.bar_chart(team_wins)
-            
+
+        # --- STRUMENTAZIONE DELLA RICERCA (colonne presenti con MINIMAX_STATS = True) ---
+        if 'Minimax_Avg_Nodes' in df.columns:
+            st.divider()
+            st.subheader("🔬 Strumentazione della Ricerca (Minimax)")
+
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Nodi per decisione", f"{df['Minimax_Avg_Nodes'].mean():.0f}")
+            m2.metric("Foglie valutate", f"{df['Minimax_Avg_Leaves'].mean():.0f}")
+            m3.metric("Tagli alpha-beta", f"{df['Minimax_Avg_Cutoffs'].mean():.0f}")
+            m4.metric("Hit rate cache danni", f"{df['Minimax_Damage_Cache_Hit_Rate'].mean():.1%}")
+
+            col5, col6 = st.columns(2)
+            with col5:
+                st.markdown("**Dove va il tempo di una decisione (ms)**")
+                phase_cols = {
+                    "Copia": 'Minimax_Avg_Copy_ms',
+                    "Azioni": 'Minimax_Avg_Actions_ms',
+                    "Turni": 'Minimax_Avg_Turns_ms',
+                    "Danni": 'Minimax_Avg_Damage_ms',
+                    "Valutazione": 'Minimax_Avg_Eval_ms',
+                    "Altro": 'Minimax_Avg_Other_ms',
+                }
+                # I CSV precedenti non hanno la fase dei danni (era dentro "Turni")
+                phases = pd.Series({label: df[col].mean() for label, col in phase_cols.items() if col in df.columns})
+                st.bar_chart(phases, color="#FF4B4B")
+            with col6:
+                st.markdown("**Nodi, foglie e tagli per partita**")
+                st.line_chart(df.set_index('Game_ID')[['Minimax_Avg_Nodes', 'Minimax_Avg_Leaves', 'Minimax_Avg_Cutoffs']])
+
+        # --- LATENZA PER DECISIONE (una riga per turno e IA in stress_test_timings.csv) ---
+        timings_path = os.path.join(os.path.dirname(__file__), 'stress_test_timings.csv')
+        if os.path.exists(timings_path):
+            st.divider()
+            st.subheader("⏱️ Latenza per Decisione (ms)")
+            if 'Minimax_Avg_Nodes' in df.columns:
+                st.warning("Esecuzione con statistiche di ricerca (MINIMAX_STATS): le latenze del Minimax "
+                           "includono l'overhead della strumentazione.")
+            timings = load_report(timings_path, file_mtime(timings_path))
+            latency = timings.assign(Time_ms=timings['Time_ns'] / 1e6)
+
+            # I turni peggiori (quelli che bloccano la UI) spariscono nelle medie: percentili e massimo
+            quantiles = latency.groupby('AI')['Time_ms'].quantile([0.5, 0.9, 0.99]).unstack()
+            quantiles.columns = ["p50", "p90", "p99"]
+            quantiles["max"] = latency.groupby('AI')['Time_ms'].max()
+            st.dataframe(quantiles.style.format("{:.3f}"))
+
+            col7, col8 = st.columns(2)
+            with col7:
+                st.markdown("**Latenza p90 per Pokemon rimasti in campo (entrambe le squadre)**")
+                curve = latency.groupby(['Total_Mons_Left', 'AI'])['Time_ms'].quantile(0.9).unstack()
+                st.line_chart(curve)
+            with col8:
+                st.markdown("**Distribuzione dei tempi del Minimax**")
+                minimax_ms = latency.loc[latency['AI'] == 'Minimax', 'Time_ms']
+                if not minimax_ms.empty:
+                    bins = pd.cut(minimax_ms, bins=20)
+                    histogram = bins.value_counts(sort=False)
+                    histogram.index = [f"{interval.right:.1f}" for interval in histogram.index]
+                    st.bar_chart(histogram, color="#FF4B4B")
+
         st.divider()
         st.subheader("📄 Dati Grezzi (CSV)")
         st.dataframe(df, use_container_width=True)
\ No newline at end of file
@@ -0,0 +1,252 @@
+import time
+import numpy as np
+
+from pokemon_engine import (TYPE_EFFECTIVENESS_TABLE, N_TYPE_COMBOS, DAMAGE_ROLLS, TEAM_SIZE,
+                            load_moves, Pokedex)
+
+# --- MOTORE VETTORIALE: N BATTAGLIE IN PARALLELO ---
+# Ogni battaglia è una riga di array NumPy (HP e attivi). I dati statici (statistiche, mosse,
+# tabelle del danno) sono per "sfida" (coppia di squadre) e le righe vi puntano con un indice,
+# quindi 100k copie della stessa sfida condividono un'unica tabella.
+# Un turno viene risolto per tutte le righe ancora in corso, con le regole di
+# Battle.resolve_turn (usato da stress_test.py): prima i cambi, poi gli attacchi in ordine
+# di velocità (a parità decide la moneta), precisione, danno, KO e rimpiazzo con il primo
+# Pokemon vivo.
+
+ATTACK = 0
+SWITCH = 1
+
+NO_WINNER = -1
+DRAW = 2          # vincitore: 0 = squadra 1, 1 = squadra 2, 2 = pareggio (anti-stallo)
+
+MOVES_PER_MON = 4
+
+EFFECTIVENESS = np.array(TYPE_EFFECTIVENESS_TABLE, dtype=np.float64)
+ROLLS = np.array(DAMAGE_ROLLS, dtype=np.float64)
+
+def _team_arrays(team):
+    """Statistiche e mosse di una squadra come array (slot vuoti: HP 0, nessuna mossa)"""
+    stats = np.zeros((7, TEAM_SIZE), dtype=np.int64)
+    combo = np.zeros(TEAM_SIZE, dtype=np.int64)
+    moves = np.zeros((5, TEAM_SIZE, MOVES_PER_MON), dtype=np.float64)
+    for i, p in enumerate(team):
+        stats[:, i] = (p.max_hp, p.attack, p.defense, p.sp_attack, p.sp_defense, p.speed, len(p.moves))
+        combo[i] = p.type_combo
+        for j, m in enumerate(p.moves[:MOVES_PER_MON]):
+            special = m.category.lower() in ["speciale", "special"]
+            stab = 1.5 if m.type in p.types else 1.0
+            moves[:, i, j] = (m.power, m.type_id, special, m.accuracy, stab)
+    return stats, combo, moves
+
+class BatchBattle:
+    """N battaglie indipendenti risolte insieme, una per riga.
+    team_pairs: lista di (squadra 1, squadra 2) di Pokemon; le coppie ripetute (stessi
+    oggetti lista) condividono i dati statici. Memoria statica: ~5 KB per coppia distinta."""
+    def __init__(self, team_pairs, seed=None, max_turns=150):
+        pair_ids = {}
+        team_cache = {}
+        pairs = []
+        pair_of_row = []
+        for team1, team2 in team_pairs:
+            key = (id(team1), id(team2))
+            if key not in pair_ids:
+                pair_ids[key] = len(pairs)
+                for team in (team1, team2):
+                    if id(team) not in team_cache:
+                        team_cache[id(team)] = _team_arrays(team)
+                pairs.append((team_cache[id(team1)], team_cache[id(team2)]))
+            pair_of_row.append(pair_ids[key])
+
+        self.n = len(pair_of_row)
+        self.pair = np.array(pair_of_row, dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+        self.max_turns = max_turns
+
+        # Dati statici per coppia: (P, 2, 6) e (P, 2, 6, 4)
+        stats = np.stack([np.stack([a[0], b[0]], axis=1) for a, b in pairs])
+        self.max_hp, self.attack, self.defense, self.sp_attack, self.sp_defense, self.speed, self.n_moves = (
+            stats[:, k] for k in range(7))
+        self.type_combo = np.stack([np.stack([a[1], b[1]]) for a, b in pairs])
+        moves = np.stack([np.stack([a[2], b[2]], axis=1) for a, b in pairs])
+        self.move_power, move_type, move_special, self.move_accuracy, self.move_stab = (
+            moves[:, k] for k in range(5))
+        self.move_type = move_type.astype(np.int64)
+        self.move_special = move_special.astype(bool)
+        self._build_damage_tables()
+
+        # Stato che cambia durante la battaglia, una riga per battaglia
+        self.hp = self.max_hp[self.pair].copy()
+        self.active = np.zeros((self.n, 2), dtype=np.int64)
+        self.turns = np.zeros(self.n, dtype=np.int64)
+        self.done = np.zeros(self.n, dtype=bool)
+        self.winner = np.full(self.n, NO_WINNER, dtype=np.int64)
+        self.misses = np.zeros((self.n, 2), dtype=np.int64)
+        self.switches = np.zeros((self.n, 2), dtype=np.int64)
+
+    @classmethod
+    def from_teams(cls, team1, team2, n, seed=None, max_turns=150):
+        """n copie della stessa sfida"""
+        return cls([(team1, team2)] * n, seed, max_turns)
+
+    def _build_damage_tables(self):
+        """Tabelle (P, lato, attaccante, difensore, mossa) di danno base e danno atteso:
+        tutto tranne i tiri casuali è statico, come nella DamageCache del motore"""
+        opp = slice(None, None, -1)   # lato opposto: [1, 0]
+        special = self.move_special[:, :, :, None, :]
+        atk = np.where(special, self.sp_attack[:, :, :, None, None], self.attack[:, :, :, None, None])
+        dfs = np.where(special, self.sp_defense[:, opp, None, :, None], self.defense[:, opp, None, :, None])
+        dfs = np.maximum(dfs, 1)      # slot vuoti
+        power = self.move_power[:, :, :, None, :]
+        eff = EFFECTIVENESS[self.move_type[:, :, :, None, :] * N_TYPE_COMBOS
+                            + self.type_combo[:, opp, None, :, None]]
+        # Livello ipotetico 50 (stessa formula di get_base_damage)
+        base = ((2 * 50 / 5 + 2) * power * (atk / dfs) / 50 + 2)
+        self.base_table = base * self.move_stab[:, :, :, None, :] * eff
+
+        rolls = np.floor(self.base_table[..., None] * ROLLS).mean(axis=-1)
+        hit = np.clip(self.move_accuracy[:, :, :, None, :], 0, 100) / 100
+        valid = np.arange(MOVES_PER_MON) < self.n_moves[:, :, :, None, None]
+        self.expected_table = np.where(valid, rolls * hit, -1.0)
+
+    def live_rows(self):
+        return np.flatnonzero(~self.done)
+
+    # --- RISOLUZIONE DI UN TURNO ---
+
+    def _attack(self, rows, side, attacking, move_idx):
+        pair = self.pair[rows]
+        opp = 1 - side
+        att_slot = self.active[rows, side]
+        def_slot = self.active[rows, opp]
+        can_hit = attacking & (self.hp[rows, side, att_slot] > 0) & (self.hp[rows, opp, def_slot] > 0)
+
+        acc_roll = self.rng.integers(1, 101, size=len(rows))
+        dmg_roll = ROLLS[self.rng.integers(0, len(ROLLS), size=len(rows))]
+        hit = acc_roll <= self.move_accuracy[pair, side, att_slot, move_idx]
+
+        missed = can_hit & ~hit
+        self.misses[rows[missed], side[missed]] += 1
+
+        landed = can_hit & hit
+        base = self.base_table[pair, side, att_slot, def_slot, move_idx]
+        dmg = np.floor(base * dmg_roll).astype(np.int64)
+        rl, ol, dl = rows[landed], opp[landed], def_slot[landed]
+        self.hp[rl, ol, dl] = np.maximum(0, self.hp[rl, ol, dl] - dmg[landed])
+
+    def step(self, actions1, actions2, rows=None):
+        """Risolve un turno per le battaglie `rows` (default: tutte quelle in corso).
+        actions1/actions2: coppie (tipi, indici) di array allineati a rows
+        (tipo ATTACK/SWITCH, indice della mossa o dello slot in squadra)"""
+        if rows is None:
+            rows = self.live_rows()
+        pair = self.pair[rows]
+        kinds = np.stack([actions1[0], actions2[0]], axis=1)
+        idxs = np.stack([actions1[1], actions2[1]], axis=1)
+        self.turns[rows] += 1
+
+        # 1. Cambi (solo verso Pokemon vivi)
+        for s in (0, 1):
+            target = np.clip(idxs[:, s], 0, TEAM_SIZE - 1)
+            ok = (kinds[:, s] == SWITCH) & (self.hp[rows, s, target] > 0)
+            self.active[rows[ok], s] = target[ok]
+            self.switches[rows[ok], s] += 1
+
+        # 2. Attacchi in ordine di velocità
+        attacking = kinds == ATTACK
+        speed0 = self.speed[pair, 0, self.active[rows, 0]]
+        speed1 = self.speed[pair, 1, self.active[rows, 1]]
+        coin = self.rng.random(len(rows)) > 0.5
+        first = np.where(speed0 == speed1, coin, speed1 > speed0).astype(np.int64)
+        local = np.arange(len(rows))
+        for side in (first, 1 - first):
+            n_moves = np.maximum(self.n_moves[pair, side, self.active[rows, side]], 1)
+            self._attack(rows, side, attacking[local, side], idxs[local, side] % n_moves)
+
+        # 3. KO: entra il primo Pokemon vivo, altrimenti la battaglia finisce
+        for s in (0, 1):
+            fainted = ~self.done[rows] & (self.hp[rows, s, self.active[rows, s]] <= 0)
+            alive = self.hp[rows, s, :] > 0
+            any_alive = alive.any(axis=1)
+            replace = fainted & any_alive
+            self.active[rows[replace], s] = alive.argmax(axis=1)[replace]
+            lost = rows[fainted & ~any_alive]
+            self.winner[lost] = 1 - s
+            self.done[lost] = True
+
+        # Anti-Stallo
+        stalled = rows[~self.done[rows] & (self.turns[rows] >= self.max_turns)]
+        self.winner[stalled] = DRAW
+        self.done[stalled] = True
+
+    def run(self, policy1, policy2):
+        """Gioca tutte le battaglie fino alla fine.
+        policy(batch, side, rows) -> (tipi, indici) per le righe in corso"""
+        rows = self.live_rows()
+        while len(rows):
+            self.step(policy1(self, 0, rows), policy2(self, 1, rows), rows)
+            rows = self.live_rows()
+        return self
+
+    def summary(self):
+        return {
+            "battles": self.n,
+            "team1_wins": int((self.winner == 0).sum()),
+            "team2_wins": int((self.winner == 1).sum()),
+            "draws": int((self.winner == DRAW).sum()),
+            "avg_turns": float(self.turns.mean()),
+            "avg_misses": self.misses.mean(axis=0).tolist(),
+            "avg_switches": self.switches.mean(axis=0).tolist(),
+        }
+
+# --- POLICY VETTORIALI ---
+
+def greedy_policy(batch, side, rows):
+    """Stessa logica di get_best_action_greedy, sul danno atteso: la mossa più forte,
+    oppure un cambio se il migliore in panchina fa più di 20 danni in più e l'attuale < 15"""
+    pair = batch.pair[rows]
+    active = batch.active[rows, side]
+    opp_active = batch.active[rows, 1 - side]
+
+    # (righe, attaccante, mossa) contro l'avversario in campo
+    table = batch.expected_table[pair, side, :, opp_active, :]
+    local = np.arange(len(rows))
+    dmg = table[local, active]
+    best_move = dmg.argmax(axis=1)
+    max_dmg = dmg.max(axis=1)
+
+    bench = table.max(axis=2)
+    usable = (batch.hp[rows, side, :] > 0)
+    usable[local, active] = False
+    bench = np.where(usable, bench, -1.0)
+    best_bench = bench.argmax(axis=1)
+    best_bench_dmg = bench.max(axis=1)
+
+    switch = (max_dmg < 15) & (best_bench_dmg > max_dmg + 20)
+    kinds = np.where(switch, SWITCH, ATTACK)
+    idxs = np.where(switch, best_bench, best_move)
+    return kinds, idxs
+
+def random_policy(batch, side, rows):
+    """Attacca sempre con una mossa a caso"""
+    return np.full(len(rows), ATTACK), batch.rng.integers(0, MOVES_PER_MON, size=len(rows))
+
+# --- MAIN: STATISTICHE DI BILANCIAMENTO ---
+N_BATTLES = 100_000
+
+if __name__ == "__main__":
+    from stress_test import build_specific_team, TEAM_1_NAMES, TEAM_2_NAMES
+
+    moves_db = load_moves('moves.json')
+    pokedex = Pokedex(moves_db)
+    team1 = build_specific_team(pokedex, TEAM_1_NAMES)
+    team2 = build_specific_team(pokedex, TEAM_2_NAMES)
+
+    print(f"⚡ {N_BATTLES} battaglie Greedy vs Greedy (Offensivo vs Difensivo)")
+    start = time.perf_counter()
+    batch = BatchBattle.from_teams(team1, team2, N_BATTLES, seed=42).run(greedy_policy, greedy_policy)
+    elapsed = time.perf_counter() - start
+
+    stats = batch.summary()
+    print(f"⏱️ {elapsed:.2f}s ({N_BATTLES / elapsed:,.0f} battaglie/s)")
+    print(f"🏆 Offensivo {stats['team1_wins']} | Difensivo {stats['team2_wins']} | Pareggi {stats['draws']}")
+    print(f"📊 Turni medi {stats['avg_turns']:.1f} | Miss medi {stats['avg_misses']} | Cambi medi {stats['avg_switches']}")
@@ -0,0 +1,304 @@
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from pokemon_engine import (load_moves, load_gen1_pokemon, calculate_damage, get_type_effectiveness,
+                            TYPE_EFFECTIVENESS_TABLE, N_TYPE_COMBOS, Battle, Pokedex, make_team, make_rng,
+                            DAMAGE_CACHE)
+from ai_minimax import (SearchContext, TranspositionTable, _search_root, simulate_turn, get_best_action_minimax,
+                        get_possible_actions)
+from stress_test import build_specific_team, get_best_action_greedy, TEAM_1_NAMES, TEAM_2_NAMES
+
+# --- CONFIGURAZIONE ---
+SEED = 42
+N_PAIRS = 2000       # coppie (attaccante, difensore, mossa) campionate
+REPEAT = 15          # ripetizioni: si tiene il tempo migliore
+SEARCH_DEPTHS = [1, 2, 3]
+SEARCH_POSITIONS = 5 # battaglie casuali su cui confrontare le ricerche
+MINIMAX_POSITIONS = 8    # posizioni a squadre fisse (dopo 0..7 turni casuali con seed) per il Minimax
+TURN_CASES = 200         # coppie di azioni per simulate_turn
+BATTLES = 50             # battaglie complete Greedy vs Greedy
+TOLERANCE = 0.10         # confronto: +10% sul baseline = regressione
+BASELINE_FILE = 'benchmark_baseline.json'
+
+def build_damage_cases(seed=SEED, n_pairs=N_PAIRS):
+    random.seed(seed)
+    moves_db = load_moves('moves.json')
+    pokedex = load_gen1_pokemon('pokedex.json', moves_db)
+    cases = []
+    for _ in range(n_pairs):
+        attacker, defender = random.sample(pokedex, 2)
+        cases.append((attacker, defender, random.choice(attacker.moves)))
+    return cases
+
+def best_time_ns(func, repeat=REPEAT):
+    """Tempo migliore (perf_counter_ns) su `repeat` esecuzioni di func()"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        elapsed = time.perf_counter_ns() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def build_fixed_teams(seed=SEED):
+    """Le due squadre dello stress test, con moveset fissati dal seed"""
+    pokedex = Pokedex(load_moves('moves.json'), rng=random.Random(seed))
+    return build_specific_team(pokedex, TEAM_1_NAMES), build_specific_team(pokedex, TEAM_2_NAMES)
+
+def build_fixed_positions(team1, team2, seed=SEED, n_positions=MINIMAX_POSITIONS):
+    """Offensivo vs Difensivo dopo 0, 1, 2... turni casuali (stessa sequenza a ogni esecuzione)"""
+    rng = random.Random(seed)
+    positions = []
+    for turns in range(n_positions):
+        battle = Battle(make_team(team1), make_team(team2), make_rng(seed, buffered=False))
+        for _ in range(turns):
+            ai = rng.choice(get_possible_actions(battle.team2, battle.p2_active))
+            pl = rng.choice(get_possible_actions(battle.team1, battle.p1_active))
+            if battle.resolve_turn(pl, ai) != "CONTINUE":
+                battle = None   # partita finita: posizione inutile per la ricerca
+                break
+        if battle is not None:
+            positions.append(battle)
+    return positions
+
+# --- 1. MICRO-BENCHMARK: EFFICACIA DEI TIPI ---
+def bench_type_effectiveness(cases):
+    def string_lookup():
+        for _, defender, move in cases:
+            get_type_effectiveness(move.type, defender.types)
+
+    def table_lookup():
+        table = TYPE_EFFECTIVENESS_TABLE
+        for _, defender, move in cases:
+            table[move.type_id * N_TYPE_COMBOS + defender.type_combo]
+
+    string_ns = best_time_ns(string_lookup) / len(cases)
+    table_ns = best_time_ns(table_lookup) / len(cases)
+    return string_ns, table_ns
+
+# --- 2. MICRO-BENCHMARK: PERCORSO DEL DANNO ---
+def bench_calculate_damage(cases):
+    def damage_path():
+        for attacker, defender, move in cases:
+            calculate_damage(attacker, defender, move)
+
+    return best_time_ns(damage_path) / len(cases)
+
+# --- 3. CONTEGGIO NODI DELLA RICERCA ---
+# Stessa profondità, stesse posizioni: ricerca completa (nessun taglio, come la versione
+# precedente), poi alpha-beta con tabella, ordinamento delle azioni ed eliminazione delle
+# dominate. Le ultime cambiano l'albero, quindi l'azione scelta può differire.
+# (nome, alpha-beta, tabella, ordinamento, eliminazione dominate)
+SEARCH_VARIANTS = [
+    ("Completa", False, False, False, False),
+    ("Completa + TT", False, True, False, False),
+    ("Alpha-beta + TT", True, True, False, False),
+    ("+ Ordinamento", True, True, True, False),
+    ("+ Dominate", True, True, True, True),
+]
+
+def build_search_positions(seed=SEED, n_positions=SEARCH_POSITIONS):
+    random.seed(seed)
+    moves_db = load_moves('moves.json')
+    pokedex = load_gen1_pokemon('pokedex.json', moves_db)
+    return [Battle(make_team(random.sample(pokedex, 6)), make_team(random.sample(pokedex, 6)))
+            for _ in range(n_positions)]
+
+def bench_search_nodes(positions, depth):
+    """Per ogni variante: (nodi totali, tagli, secondi, azioni scelte)"""
+    results = {}
+    for name, prune, use_tt, ordering, dominated in SEARCH_VARIANTS:
+        nodes = cutoffs = 0
+        actions = []
+        start = time.perf_counter()
+        for battle in positions:
+            sim = copy.deepcopy(battle)
+            sim.enable_hashing()
+            ctx = SearchContext(True, TranspositionTable() if use_tt else None, prune=prune,
+                                ordering=ordering, prune_dominated=dominated)
+            action, _ = _search_root(sim, depth, ctx)
+            nodes += ctx.nodes
+            cutoffs += ctx.cutoffs
+            actions.append(action)
+        results[name] = (nodes, cutoffs, time.perf_counter() - start, actions)
+    return results
+
+# --- 4. TURNO SIMULATO, MINIMAX, CARICAMENTO, BATTAGLIE COMPLETE ---
+def bench_simulate_turn(positions, seed=SEED, n_cases=TURN_CASES):
+    """simulate_turn (copia + turno deterministico) su coppie di azioni fisse"""
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(n_cases):
+        battle = rng.choice(positions)
+        ai = rng.choice(get_possible_actions(battle.team2, battle.p2_active))
+        pl = rng.choice(get_possible_actions(battle.team1, battle.p1_active))
+        cases.append((battle, ai, pl))
+
+    def turns():
+        for battle, ai, pl in cases:
+            simulate_turn(battle, ai, pl, deterministic=True)
+
+    return best_time_ns(turns) / len(cases)
+
+def bench_minimax(positions, depth):
+    """(ns per decisione, nodi totali); ogni decisione parte da una tabella vuota"""
+    def decisions():
+        for battle in positions:
+            get_best_action_minimax(battle, depth=depth)
+
+    nodes = 0
+    for battle in positions:
+        sim = battle.search_copy()
+        sim.enable_hashing()
+        ctx = SearchContext(True, TranspositionTable())
+        _search_root(sim, depth, ctx)
+        nodes += ctx.nodes
+    return best_time_ns(decisions, repeat=5) / len(positions), nodes
+
+def bench_loaders():
+    moves_db = load_moves('moves.json')
+    moves_ns = best_time_ns(lambda: load_moves('moves.json'))
+    pokedex_ns = best_time_ns(lambda: load_gen1_pokemon('pokedex.json', moves_db, rng=random.Random(SEED)))
+    return moves_ns, pokedex_ns
+
+def play_greedy_battle(team1, team2, seed):
+    """Una battaglia Greedy vs Greedy con il motore reale; ritorna il numero di turni"""
+    battle = Battle(make_team(team1), make_team(team2), make_rng(seed))
+    outcome = "CONTINUE"
+    while outcome == "CONTINUE" and battle.turn_count < 150:
+        # Il Greedy di stress_test gioca come squadra 2: per la squadra 1 si scambiano i lati
+        mirror = copy.copy(battle)
+        mirror.p1_active, mirror.p2_active, mirror.team2 = battle.p2_active, battle.p1_active, battle.team1
+        outcome = battle.resolve_turn(get_best_action_greedy(mirror), get_best_action_greedy(battle))
+    return battle.turn_count
+
+def bench_battles(team1, team2, n_battles=BATTLES):
+    """(ns per battaglia, turni totali) su n_battles battaglie con seed 0..n-1"""
+    turns = [0]
+
+    def battles():
+        turns[0] = sum(play_greedy_battle(team1, team2, seed) for seed in range(n_battles))
+
+    return best_time_ns(battles, repeat=5) / n_battles, turns[0]
+
+# --- 5. SUITE, BASELINE E CONFRONTO ---
+def run_suite():
+    """Tutte le metriche della suite, più basso = meglio: {nome: valore}"""
+    results = {}
+    cases = build_damage_cases()
+    string_ns, table_ns = bench_type_effectiveness(cases)
+    results["type_effectiveness_string_ns"] = string_ns
+    results["type_effectiveness_table_ns"] = table_ns
+    DAMAGE_CACHE.clear()
+    results["calculate_damage_ns"] = bench_calculate_damage(cases)
+
+    team1, team2 = build_fixed_teams()
+    positions = build_fixed_positions(team1, team2)
+    results["simulate_turn_ns"] = bench_simulate_turn(positions)
+    for depth in SEARCH_DEPTHS:
+        decision_ns, nodes = bench_minimax(positions, depth)
+        results[f"minimax_d{depth}_ns"] = decision_ns
+        results[f"minimax_d{depth}_nodes"] = nodes
+
+    moves_ns, pokedex_ns = bench_loaders()
+    results["load_moves_ns"] = moves_ns
+    results["load_gen1_pokemon_ns"] = pokedex_ns
+
+    battle_ns, turns = bench_battles(team1, team2)
+    results["battle_greedy_ns"] = battle_ns
+    results["battle_greedy_turns"] = turns
+    return results
+
+def format_value(name, value):
+    if name.endswith("_ns"):
+        if value >= 1e6: return f"{value / 1e6:10.2f} ms"
+        if value >= 1e3: return f"{value / 1e3:10.2f} us"
+        return f"{value:10.1f} ns"
+    return f"{value:10.0f}   "
+
+def save_baseline(results, path):
+    data = {
+        "meta": {"seed": SEED, "python": platform.python_version(), "machine": platform.machine(),
+                 "created": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "results": results,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+def compare_to_baseline(results, path, tolerance=TOLERANCE):
+    """Stampa le differenze rispetto al baseline; ritorna le metriche peggiorate oltre la tolleranza"""
+    with open(path) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"  {name:<30} {format_value(name, value)}   (nuova metrica)")
+            continue
+        delta = (value - base) / base if base else 0.0
+        flag = ""
+        if delta > tolerance:
+            flag = "  ❌ REGRESSIONE"
+            regressions.append(name)
+        elif delta < -tolerance:
+            flag = "  ✅ migliorata"
+        print(f"  {name:<30} {format_value(name, value)}   base {format_value(name, base)}   {delta:+7.1%}{flag}")
+    return regressions
+
+def print_search_variants():
+    print(f"\n🌳 Nodi della ricerca ({SEARCH_POSITIONS} posizioni)")
+    positions = build_search_positions()
+    for depth in SEARCH_DEPTHS:
+        results = bench_search_nodes(positions, depth)
+        full_nodes = results[SEARCH_VARIANTS[0][0]][0]
+        reference_actions = results[SEARCH_VARIANTS[0][0]][3]
+        for name, (nodes, cutoffs, elapsed, actions) in results.items():
+            same = "ok" if actions == reference_actions else "DIVERSE"
+            branching = nodes ** (1 / depth) / len(positions) ** (1 / depth)
+            print(f"  D{depth} {name:<16} {nodes:>8} nodi  {cutoffs:>6} tagli  {elapsed:7.3f}s  "
+                  f"b_eff {branching:5.1f}  (x{full_nodes / nodes:.1f} meno nodi, azioni {same})")
+
+def run_benchmarks(save=None, compare=None, tolerance=TOLERANCE, variants=False):
+    """Esegue la suite; ritorna la lista delle regressioni (vuota senza --compare)"""
+    print(f"⏱️ Benchmark motore (seed {SEED}, best of {REPEAT}, perf_counter_ns)")
+    print("-" * 50)
+    results = run_suite()
+
+    regressions = []
+    if compare:
+        print(f"📏 Confronto con {compare} (tolleranza {tolerance:.0%})")
+        regressions = compare_to_baseline(results, compare, tolerance)
+    else:
+        for name, value in results.items():
+            print(f"  {name:<30} {format_value(name, value)}")
+
+    if save:
+        save_baseline(results, save)
+        print(f"💾 Baseline salvato in {save}")
+    if variants:
+        print_search_variants()
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressioni oltre il {tolerance:.0%}: {', '.join(regressions)}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Suite di benchmark del motore e delle IA")
+    parser.add_argument("--save", nargs="?", const=BASELINE_FILE, default=None,
+                        help=f"scrive i risultati come baseline JSON (default {BASELINE_FILE})")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_FILE, default=None,
+                        help="confronta con un baseline JSON ed esce con codice 1 se ci sono regressioni")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="peggioramento relativo ammesso (0.10 = 10%%)")
+    parser.add_argument("--variants", action="store_true",
+                        help="aggiunge il confronto dei nodi tra varianti di ricerca (lento a D3)")
+    args = parser.parse_args()
+    if args.compare and not os.path.exists(args.compare):
+        sys.exit(f"Baseline {args.compare} non trovato: eseguire prima con --save")
+    sys.exit(1 if run_benchmarks(args.save, args.compare, args.tolerance, args.variants) else 0)
@@ -3,32 +3,94 @@ import random
 import os
 import math
 import copy
+import operator
+import hashlib
+import pickle
+import struct
+import sys
+import threading
+import zlib
+from time import perf_counter_ns
+
+try:
+    import numpy as np
+except ImportError:  # BufferedRNG non disponibile, BattleRNG funziona comunque
+    np = None
 
 # --- 0. CLASSI BASE ---
 
-class Move:
+# Mosse e specie sono record immutabili e condivisi (flyweight): ogni Pokemon in battaglia
+# tiene solo il riferimento alla specie e i propri HP, quindi copiare una squadra costa
+# 6 piccoli oggetti invece di duplicare nomi, tipi, statistiche e mosse.
+
+class _Record:
+    """Base dei record immutabili: copy/deepcopy restituiscono lo stesso oggetto"""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} è immutabile")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # pickle (processi worker) ricostruisce passando dal costruttore
+        return (type(self), self._init_args())
+
+class Move(_Record):
+    __slots__ = ('name', 'type', 'power', 'accuracy', 'category', 'type_id')
+
     def __init__(self, name, type, power, accuracy, category):
-        self.name = name
-        self.type = type
-        self.power = power
-        self.accuracy = accuracy
-        self.category = category    
+        init = object.__setattr__
+        init(self, 'name', name)
+        init(self, 'type', type)
+        init(self, 'power', power)
+        init(self, 'accuracy', accuracy)
+        init(self, 'category', category)
+        init(self, 'type_id', TYPE_IDS.get(type, NEUTRAL_TYPE_ID))
+
+    def _init_args(self):
+        return (self.name, self.type, self.power, self.accuracy, self.category)
+
     def __repr__(self):
         return f"{self.name} ({self.type}, {self.category})"
 
-class Pokemon:
+class Species(_Record):
+    """Dati statici di un Pokemon (statistiche a livello 50 e moveset), condivisi tra le squadre"""
+    __slots__ = ('id', 'name', 'types', 'max_hp', 'attack', 'defense', 'sp_attack', 'sp_defense',
+                 'speed', 'moves', 'type_combo')
+
     def __init__(self, p_id, name, types, hp, atk, dfs, sp_atk, sp_dfs, speed, moves):
-        self.id = p_id 
-        self.name = name
-        self.types = types
-        self.max_hp = hp
-        self.current_hp = hp
-        self.attack = atk
-        self.defense = dfs
-        self.sp_attack = sp_atk
-        self.sp_defense = sp_dfs
-        self.speed = speed
-        self.moves = moves
+        init = object.__setattr__
+        init(self, 'id', p_id)
+        init(self, 'name', name)
+        init(self, 'types', tuple(types))
+        init(self, 'max_hp', hp)
+        init(self, 'attack', atk)
+        init(self, 'defense', dfs)
+        init(self, 'sp_attack', sp_atk)
+        init(self, 'sp_defense', sp_dfs)
+        init(self, 'speed', speed)
+        init(self, 'moves', tuple(moves))
+        init(self, 'type_combo', get_type_combo_id(types))
+
+    def _init_args(self):
+        return (self.id, self.name, self.types, self.max_hp, self.attack, self.defense,
+                self.sp_attack, self.sp_defense, self.speed, self.moves)
+
+    def __repr__(self):
+        return f"{self.name} (HP: {self.max_hp})"
+
+class Pokemon:
+    """Pokemon in battaglia: riferimento alla specie + HP correnti"""
+    __slots__ = ('species', 'current_hp')
+
+    def __init__(self, species, current_hp=None):
+        self.species = species
+        self.current_hp = species.max_hp if current_hp is None else current_hp
 
     def is_fainted(self):
         return self.current_hp <= 0
@@ -37,10 +99,30 @@ class Pokemon:
         self.current_hp -= amount
         if self.current_hp < 0: self.current_hp = 0
 
+    def __copy__(self):
+        return Pokemon(self.species, self.current_hp)
+
+    def __deepcopy__(self, memo):
+        # La specie è condivisa: basta un nuovo oggetto con gli stessi HP
+        return Pokemon(self.species, self.current_hp)
+
     def __repr__(self):
         # Rappresentazione stringa per i log
         return f"{self.name} (HP: {self.current_hp}/{self.max_hp})"
 
+# Attributi statici letti direttamente dalla specie (pokemon.speed, pokemon.moves, ...)
+for _field in Species.__slots__:
+    setattr(Pokemon, _field, property(operator.attrgetter('species.' + _field)))
+del _field
+
+def make_team(species_list):
+    """Nuova squadra a piena salute: un Pokemon per specie, nient'altro viene copiato"""
+    return [Pokemon(s) for s in species_list]
+
+def reset_team(team):
+    for p in team:
+        p.current_hp = p.max_hp
+
 # Tabella Tipi 
 TYPE_CHART = {
     "Normal":   {"Rock": 0.5, "Ghost": 0.0, "Steel": 0.5},
@@ -63,6 +145,201 @@ TYPE_CHART = {
     "Fairy":    {"Fire": 0.5, "Fighting": 2.0, "Poison": 0.5, "Dragon": 2.0, "Dark": 2.0, "Steel": 0.5}
 }
 
+# --- TABELLA TIPI PRECALCOLATA (ID interi) ---
+# Ogni tipo ha un ID piccolo (ordine di types.json); la difesa è una coppia (tipo1, tipo2),
+# con NEUTRAL_TYPE_ID come secondo tipo per i mono-tipo. Così il moltiplicatore è un solo
+# accesso: TYPE_EFFECTIVENESS_TABLE[move.type_id * N_TYPE_COMBOS + defender.type_combo]
+
+def _load_type_names(filename='types.json'):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(script_dir, filename)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            names = [t['english'] for t in json.load(f)]
+    except FileNotFoundError:
+        names = []
+    # Eventuali tipi presenti solo nella TYPE_CHART vengono accodati
+    return names + [t for t in TYPE_CHART if t not in names]
+
+def _build_effectiveness_table(type_names):
+    type_ids = {name: i for i, name in enumerate(type_names)}
+    n_ids = len(type_names) + 1
+    single = [[1.0] * n_ids for _ in range(n_ids)]
+    for atk, row in TYPE_CHART.items():
+        for dfs, mult in row.items():
+            single[type_ids[atk]][type_ids[dfs]] = mult
+    table = []
+    for atk in range(n_ids):
+        for d1 in range(n_ids):
+            for d2 in range(n_ids):
+                table.append(single[atk][d1] * single[atk][d2])
+    return tuple(table)
+
+# --- SNAPSHOT BINARIO DEI DATI ---
+# types.json, moves.json e pokedex.json (più la tabella dei tipi già espansa) vengono
+# compilati una volta in SNAPSHOT_FILE: righe di tuple in un pickle con intestazione
+# versionata. All'avvio basta confrontare mtime e dimensione dei sorgenti; se cambiano si
+# ricontrolla lo SHA-256 del contenuto e si ricompila solo se è davvero diverso.
+# L'import legge soltanto: un file da (ri)scrivere viene salvato al primo uso dei dati
+# (load_moves, Pokedex) oppure con --build-snapshot.
+# I processi worker leggono lo stesso file (o lo ereditano già caricato con fork).
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FILE = 'data_snapshot.bin'
+SNAPSHOT_MAGIC = b'PKFS'
+SNAPSHOT_HEADER = struct.Struct('<4sH')
+SNAPSHOT_SOURCES = ('types.json', 'moves.json', 'pokedex.json')
+SNAPSHOT_KEYS = ("stamps", "digest", "type_names", "effectiveness", "moves", "pokedex")
+_SNAPSHOT = None
+_SNAPSHOT_DIRTY = False    # _SNAPSHOT compilato/aggiornato in memoria ma non ancora su disco
+
+def _data_path(filename):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+def _source_stamps():
+    """(nome, mtime_ns, dimensione) dei sorgenti + CRC della TYPE_CHART; None se ne manca uno"""
+    stamps = []
+    for name in SNAPSHOT_SOURCES:
+        try:
+            st = os.stat(_data_path(name))
+        except FileNotFoundError:
+            return None
+        stamps.append((name, st.st_mtime_ns, st.st_size))
+    stamps.append(("TYPE_CHART", zlib.crc32(repr(TYPE_CHART).encode()), 0))
+    return tuple(stamps)
+
+def _source_digest():
+    digest = hashlib.sha256(repr(TYPE_CHART).encode())
+    for name in SNAPSHOT_SOURCES:
+        with open(_data_path(name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def _parse_moves(filename):
+    """Righe (nome, tipo, potenza, precisione, categoria) delle mosse con potenza; None se manca il file"""
+    try:
+        with open(_data_path(filename), 'r', encoding='utf-8') as f:
+            raw_moves = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    rows = []
+    for m in raw_moves:
+        if 'power' in m and m['power'] is not None:
+            category = m.get('category', 'Fisico')
+            raw_acc = m.get('accuracy')
+            accuracy = 100 if raw_acc is None else raw_acc
+            rows.append((m['ename'], m['type'], m['power'], accuracy, category))
+    return rows
+
+def _parse_pokedex(filename):
+    """Righe (id, nome, tipi, statistiche base) di tutto il Pokedex; None se manca il file"""
+    try:
+        with open(_data_path(filename), 'r', encoding='utf-8') as f:
+            raw_data = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    rows = []
+    for p in raw_data:
+        b = p['base']
+        stats = (b['HP'], b['Attack'], b['Defense'], b['Sp. Attack'], b['Sp. Defense'], b['Speed'])
+        rows.append((p['id'], p['name'], p['type'], stats))
+    return rows
+
+def build_snapshot():
+    """Compila i sorgenti JSON e scrive SNAPSHOT_FILE; ritorna i dati compilati"""
+    data = _compile_snapshot()
+    _write_snapshot(data)
+    return data
+
+def _compile_snapshot():
+    type_names = _load_type_names()
+    return {
+        "stamps": _source_stamps(),
+        "digest": _source_digest(),
+        "type_names": type_names,
+        "effectiveness": _build_effectiveness_table(type_names),
+        "moves": _parse_moves('moves.json'),
+        "pokedex": _parse_pokedex('pokedex.json'),
+    }
+
+def _write_snapshot(data):
+    # Scrittura atomica: più processi possono ricompilare insieme senza leggere file a metà
+    path = _data_path(SNAPSHOT_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Cartella in sola lettura o disco pieno: lo snapshot resta solo in memoria
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+def _read_snapshot():
+    try:
+        with open(_data_path(SNAPSHOT_FILE), 'rb') as f:
+            magic, version = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                return None
+            data = pickle.load(f)
+    except Exception:
+        # Qualunque file illeggibile (troncato, corpo corrotto, classi sparite) si ricompila
+        return None
+    if not isinstance(data, dict) or any(key not in data for key in SNAPSHOT_KEYS):
+        return None
+    return data
+
+def load_snapshot(write=True):
+    """Dati compilati (valido e aggiornato) oppure None se manca qualche sorgente JSON.
+    write=False non tocca il disco: se serve ricompilare, i dati restano in memoria
+    finché una chiamata con write=True non li salva."""
+    global _SNAPSHOT, _SNAPSHOT_DIRTY
+    stamps = _source_stamps()
+    if stamps is None:
+        return None
+    if _SNAPSHOT is None or _SNAPSHOT["stamps"] != stamps:
+        data = _read_snapshot()
+        dirty = False
+        if data is not None and data["stamps"] != stamps:
+            if data["digest"] == _source_digest():
+                # Sorgenti solo "toccati" (es. checkout): si aggiornano le date e basta
+                data["stamps"] = stamps
+                dirty = True
+            else:
+                data = None
+        if data is None:
+            data = _compile_snapshot()
+            dirty = True
+        _SNAPSHOT = data
+        _SNAPSHOT_DIRTY = dirty
+
+    if write and _SNAPSHOT_DIRTY:
+        _write_snapshot(_SNAPSHOT)
+        _SNAPSHOT_DIRTY = False
+    return _SNAPSHOT
+
+_IMPORT_SNAPSHOT = load_snapshot(write=False)
+TYPE_NAMES = _IMPORT_SNAPSHOT["type_names"] if _IMPORT_SNAPSHOT else _load_type_names()
+TYPE_IDS = {name: i for i, name in enumerate(TYPE_NAMES)}
+NEUTRAL_TYPE_ID = len(TYPE_NAMES)      # tipo "vuoto"/sconosciuto: sempre x1.0
+N_TYPE_IDS = len(TYPE_NAMES) + 1
+N_TYPE_COMBOS = N_TYPE_IDS * N_TYPE_IDS
+
+def get_type_combo_id(types):
+    """ID della combinazione difensiva (mono o doppio tipo); oltre il secondo tipo si ignora"""
+    ids = [TYPE_IDS.get(t, NEUTRAL_TYPE_ID) for t in types[:2]]
+    while len(ids) < 2:
+        ids.append(NEUTRAL_TYPE_ID)
+    return ids[0] * N_TYPE_IDS + ids[1]
+
+TYPE_EFFECTIVENESS_TABLE = (_IMPORT_SNAPSHOT["effectiveness"] if _IMPORT_SNAPSHOT
+                            else _build_effectiveness_table(TYPE_NAMES))
+
 def get_type_effectiveness(move_type, target_types):
     modifier = 1.0
     for t_type in target_types:
@@ -70,11 +347,11 @@ def get_type_effectiveness(move_type, target_types):
             modifier *= TYPE_CHART[move_type][t_type]
     return modifier
 
-def calculate_damage(attacker, defender, move):
-    
-    hit_chance = random.randint(1, 100)
-    if hit_chance > move.accuracy:
-        return 0, -1.0 # Miss (Colpo fallito)
+# Fattori casuali del danno: i 16 valori discreti 0.85, 0.86, ..., 1.00 (equiprobabili)
+DAMAGE_ROLLS = tuple(r / 100 for r in range(85, 101))
+
+def get_base_damage(attacker, defender, move):
+    """Danno prima del fattore casuale (STAB ed efficacia inclusi) ed efficacia"""
     cat = move.category.lower()
     if cat in ["speciale", "special"]:
         # Mossa Speciale: usa Sp. Atk vs Sp. Def
@@ -87,12 +364,173 @@ def calculate_damage(attacker, defender, move):
         def_stat = defender.defense
         
     stab = 1.5 if move.type in attacker.types else 1.0
-    effectiveness = get_type_effectiveness(move.type, defender.types)
-    random_factor = random.uniform(0.85, 1.0)
+    effectiveness = TYPE_EFFECTIVENESS_TABLE[move.type_id * N_TYPE_COMBOS + defender.type_combo]
     
     # Livello ipotetico 50
     base_dmg = ((2 * 50 / 5 + 2) * move.power * (atk_stat / def_stat) / 50 + 2)
-    final_damage = int(base_dmg * stab * effectiveness * random_factor)
+    return base_dmg * stab * effectiveness, effectiveness
+
+def get_hit_chance(move):
+    return min(max(move.accuracy, 0), 100) / 100
+
+def get_expected_hit_damage(base, move):
+    """Danno atteso con precisione inclusa, dato il danno base (senza fattore casuale)"""
+    return get_hit_chance(move) * sum(int(base * r) for r in DAMAGE_ROLLS) / len(DAMAGE_ROLLS)
+
+# --- CACHE DEL DANNO ---
+# Tutto tranne il tiro casuale dipende solo da specie attaccante, specie difensore e mossa:
+# nessuno dei tre cambia durante la battaglia, quindi il calcolo si fa una volta sola.
+
+class DamageCache:
+    """Cache limitata (FIFO) di (danno base, efficacia, danno atteso) per (attaccante, difensore, mossa).
+    La lettura è senza lock; inserimento ed eviction sono protetti perché la usano anche
+    i thread (ponder, radice parallela)."""
+    def __init__(self, maxsize=50000):
+        self.maxsize = maxsize
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, attacker, defender, move):
+        key = (attacker.id, defender.id, move.name)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        base, effectiveness = get_base_damage(attacker, defender, move)
+        entry = (base, effectiveness, get_expected_hit_damage(base, move))
+        with self.lock:
+            if len(self.entries) >= self.maxsize:
+                # Dict ordinato per inserimento: si scarta la voce più vecchia
+                self.entries.pop(next(iter(self.entries)), None)
+            self.entries[key] = entry
+        return entry
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"DamageCache(size={len(self.entries)}/{self.maxsize}, hits={self.hits}, misses={self.misses})"
+
+# Cache globale usata da calculate_damage (e quindi da tutte le IA)
+DAMAGE_CACHE = DamageCache()
+
+def damage_distribution(attacker, defender, move, cache=DAMAGE_CACHE):
+    """Modalità analitica: (danno atteso, min, max, distribuzione).
+    min/max sono sui colpi andati a segno; la distribuzione è una lista di
+    (danno, probabilità) che include il colpo fallito (danno 0) se accuracy < 100."""
+    if cache is not None:
+        base, _, expected = cache.get(attacker, defender, move)
+    else:
+        base, _ = get_base_damage(attacker, defender, move)
+        expected = get_expected_hit_damage(base, move)
+    hit = get_hit_chance(move)
+    roll_prob = hit / len(DAMAGE_ROLLS)
+
+    probs = {}
+    if hit < 1.0:
+        probs[0] = 1.0 - hit
+    for r in DAMAGE_ROLLS:
+        dmg = int(base * r)
+        probs[dmg] = probs.get(dmg, 0.0) + roll_prob
+
+    return expected, int(base * DAMAGE_ROLLS[0]), int(base * DAMAGE_ROLLS[-1]), sorted(probs.items())
+
+# --- GENERATORI CASUALI PER BATTAGLIA ---
+# Ogni Battle (e ogni motore di ricerca/simulazione) può ricevere il proprio RNG invece di
+# usare il modulo globale `random`: riproducibilità per singola partita e nessuno stato
+# condiviso tra thread o processi. Con rng=None resta il comportamento globale di sempre.
+
+FORK_MASK = (1 << 63) - 1
+
+class BattleRNG(random.Random):
+    """random.Random con il tiro di un colpo in una sola chiamata"""
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.base_seed = seed
+
+    def fork(self, salt):
+        """RNG indipendente derivato da (seed, salt), senza consumare questo.
+        Senza seed (o dopo un pickle, che perde gli attributi) il nuovo RNG è non seminato."""
+        base_seed = getattr(self, "base_seed", None)
+        if base_seed is None:
+            return BattleRNG()
+        if isinstance(base_seed, int) and isinstance(salt, int):
+            # Seed intero (niente sha512 della stringa): la fork costa quanto un Random(int)
+            return BattleRNG(((base_seed & FORK_MASK) << 64) | ((salt & FORK_MASK) << 1) | 1)
+        return BattleRNG(f"{base_seed}:{salt}")
+
+    def roll(self):
+        """(tiro precisione 1..100, fattore casuale del danno)"""
+        return int(self.random() * 100) + 1, DAMAGE_ROLLS[int(self.random() * len(DAMAGE_ROLLS))]
+
+class BufferedRNG(BattleRNG):
+    """BattleRNG che pesca i tiri dei colpi a blocchi da un Generator NumPy.
+    sample/choice/random (squadre, pareggi di velocità) restano quelli di random.Random."""
+    def __init__(self, seed=None, buffer_size=4096):
+        if np is None:
+            raise ImportError("BufferedRNG richiede numpy")
+        super().__init__(seed)
+        self.generator = np.random.default_rng(seed)
+        self.buffer_size = buffer_size
+        self._rolls = iter(())
+
+    def _refill(self):
+        hits = self.generator.integers(1, 101, self.buffer_size).tolist()
+        factors = [DAMAGE_ROLLS[i] for i in self.generator.integers(0, len(DAMAGE_ROLLS), self.buffer_size).tolist()]
+        self._rolls = iter(list(zip(hits, factors)))
+
+    def roll(self):
+        try:
+            return next(self._rolls)
+        except StopIteration:
+            self._refill()
+            return next(self._rolls)
+
+def make_rng(seed=None, buffered=True):
+    """RNG per una battaglia: BufferedRNG se richiesto e numpy è installato, altrimenti BattleRNG"""
+    if buffered and np is not None:
+        return BufferedRNG(seed)
+    return BattleRNG(seed)
+
+def calculate_damage(attacker, defender, move, deterministic=False, cache=DAMAGE_CACHE, rng=None):
+    """Ritorna (danno, efficacia); efficacia -1.0 indica un colpo fallito.
+    Con deterministic=True nessun tiro casuale: danno atteso (precisione inclusa) arrotondato.
+    Con cache=None si ricalcola tutto senza passare dalla DamageCache.
+    rng: BattleRNG/BufferedRNG per i tiri; None usa il modulo globale random."""
+    if deterministic:
+        if cache is not None:
+            _, effectiveness, expected = cache.get(attacker, defender, move)
+        else:
+            base, effectiveness = get_base_damage(attacker, defender, move)
+            expected = get_expected_hit_damage(base, move)
+        return int(round(expected)), effectiveness
+
+    if rng is None:
+        hit_chance = random.randint(1, 100)
+        random_factor = None
+    else:
+        hit_chance, random_factor = rng.roll()
+    if hit_chance > move.accuracy:
+        return 0, -1.0 # Miss (Colpo fallito)
+
+    if cache is not None:
+        base, effectiveness, _ = cache.get(attacker, defender, move)
+    else:
+        base, effectiveness = get_base_damage(attacker, defender, move)
+    if random_factor is None:
+        random_factor = DAMAGE_ROLLS[random.randint(0, len(DAMAGE_ROLLS) - 1)]
+    final_damage = int(base * random_factor)
     
     return final_damage, effectiveness
 
@@ -100,36 +538,13 @@ def calculate_damage(attacker, defender, move):
 
 # --- CARICAMENTO MOSSE "BLINDATO" ---
 def load_moves(filename='moves.json'):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(script_dir, filename)
-
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            raw_moves = json.load(f)
-    except FileNotFoundError:
+    # Con il file di default si legge lo snapshot compilato invece del JSON
+    snapshot = load_snapshot() if filename == 'moves.json' else None
+    rows = snapshot["moves"] if snapshot else _parse_moves(filename)
+    if rows is None:
         print(f"ERRORE: File {filename} non trovato.")
         return []
-
-    valid_moves = []
-    for m in raw_moves:
-        if 'power' in m and m['power'] is not None:
-            category = m.get('category', 'Fisico')
-            
-
-            raw_acc = m.get('accuracy')
-            if raw_acc is None:
-                accuracy = 100
-            else:
-                accuracy = raw_acc
-            
-            valid_moves.append(Move(
-                m['ename'], 
-                m['type'], 
-                m['power'], 
-                accuracy, 
-                category
-            ))
-    return valid_moves
+    return [Move(*row) for row in rows]
 
 def convert_hp(base, level=50):
     return int(((base * 2 + 31) * level / 100) + level + 10)
@@ -138,54 +553,94 @@ def convert_stat(base, level=50):
     return int(((base * 2 + 31) * level / 100) + 5)
 
 
-def load_gen1_pokemon(filename='pokedex.json', all_moves=[]):
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(script_dir, filename)
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-    except FileNotFoundError:
-        return []
+def build_move_index(all_moves):
+    """Indice tipo -> posizioni in all_moves, costruito una volta sola per tutto il Pokedex"""
+    index = {}
+    for i, m in enumerate(all_moves):
+        index.setdefault(m.type, []).append(i)
+    return index
 
-    my_pokedex = []
-    for p in raw_data:
-        if p['id'] > 151: break
-        stats = p['base']
-        p_types = p['type']
-        
-        compatible = [m for m in all_moves if m.type in p_types or m.type == "Normal"]
-        
-        if len(compatible) >= 4:
-            my_moves = random.sample(compatible, 4)
-        else:
-            normal_moves = [m for m in all_moves if m.type == "Normal"]
-            needed = 4 - len(compatible)
-            fillers = random.sample(normal_moves, needed) if len(normal_moves) >= needed else normal_moves
-            my_moves = compatible + fillers
-        real_hp = convert_hp(stats['HP'])
-        real_atk = convert_stat(stats['Attack'])
-        real_def = convert_stat(stats['Defense'])
-        real_sp_atk = convert_stat(stats['Sp. Attack'])
-        real_sp_def = convert_stat(stats['Sp. Defense'])
-        real_speed = convert_stat(stats['Speed'])
-        new_mon = Pokemon(p['id'],
-            p['name'], p_types, 
-            real_hp,     
-            real_atk, 
-            real_def,
-            real_sp_atk, 
-            real_sp_def, 
-            real_speed, 
-            my_moves
-        )
-        my_pokedex.append(new_mon)
-    return my_pokedex
-
-def get_best_move_greedy(attacker, defender):
+def _pick_moves(all_moves, move_index, p_types, rng):
+    # Candidati in ordine di moves.json: stesso RNG -> stesso moveset
+    positions = set(move_index.get("Normal", ()))
+    for t in p_types:
+        positions.update(move_index.get(t, ()))
+    compatible = [all_moves[i] for i in sorted(positions)]
+
+    if len(compatible) >= 4:
+        return rng.sample(compatible, 4)
+    normal_moves = [all_moves[i] for i in move_index.get("Normal", ())]
+    needed = 4 - len(compatible)
+    fillers = rng.sample(normal_moves, needed) if len(normal_moves) >= needed else normal_moves
+    return compatible + fillers
+
+def _build_species(row, all_moves, move_index, rng):
+    p_id, name, p_types, stats = row
+    my_moves = _pick_moves(all_moves, move_index, p_types, rng)
+    base_hp, base_atk, base_def, base_sp_atk, base_sp_def, base_speed = stats
+    return Species(p_id,
+        name, p_types,
+        convert_hp(base_hp),
+        convert_stat(base_atk),
+        convert_stat(base_def),
+        convert_stat(base_sp_atk),
+        convert_stat(base_sp_def),
+        convert_stat(base_speed),
+        my_moves
+    )
+
+class Pokedex:
+    """Pokedex pigro: le specie vengono create (con moveset casuale) al primo accesso.
+    Ricerca O(1) per id (int) o per nome (str): pokedex[25], pokedex["Pikachu"].
+    id_range=(primo, ultimo) limita gli id caricabili; None = tutto pokedex.json.
+    Da `rng` si estrae un solo seed base; ogni specie pesca il moveset da un RNG proprio
+    derivato da (seed base, id), quindi non conta l'ordine in cui le specie vengono chieste."""
+    def __init__(self, all_moves, filename='pokedex.json', id_range=None, rng=None):
+        self.all_moves = all_moves
+        self.move_index = build_move_index(all_moves)
+        self.base_seed = (rng or random).getrandbits(64)
+        snapshot = load_snapshot() if filename == 'pokedex.json' else None
+        rows = snapshot["pokedex"] if snapshot else _parse_pokedex(filename)
+        if id_range is not None:
+            first, last = id_range
+            rows = [r for r in rows or () if first <= r[0] <= last]
+        self.rows_by_id = {r[0]: r for r in rows or ()}
+        self.ids_by_name = {r[1]: r[0] for r in rows or ()}
+        self.built = {}
+
+    def __len__(self):
+        return len(self.rows_by_id)
+
+    def __contains__(self, key):
+        return key in (self.ids_by_name if isinstance(key, str) else self.rows_by_id)
+
+    def __getitem__(self, key):
+        p_id = self.ids_by_name[key] if isinstance(key, str) else key
+        species = self.built.get(p_id)
+        if species is None:
+            rng = random.Random(f"{self.base_seed}:{p_id}")
+            species = _build_species(self.rows_by_id[p_id], self.all_moves, self.move_index, rng)
+            self.built[p_id] = species
+        return species
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        # In ordine di id: costruisce tutto quello che manca
+        for p_id in self.rows_by_id:
+            yield self[p_id]
+
+def load_gen1_pokemon(filename='pokedex.json', all_moves=[], rng=None, id_range=(1, 151)):
+    """Lista delle specie in id_range (di default la prima generazione), create subito.
+    Per giocare servono istanze: make_team(specie)."""
+    return list(Pokedex(all_moves, filename, id_range, rng))
+
+def get_best_move_greedy(attacker, defender, deterministic=False):
     best_move_idx = 0
     max_damage = -1
     for i, move in enumerate(attacker.moves):
-        predicted_damage, _ = calculate_damage(attacker, defender, move)
+        predicted_damage, _ = calculate_damage(attacker, defender, move, deterministic)
         if predicted_damage > max_damage:
             max_damage = predicted_damage
             best_move_idx = i
@@ -193,44 +648,214 @@ def get_best_move_greedy(attacker, defender):
 
 # --- 2. MOTORE DI BATTAGLIA ---
 
+# --- EVENTI DEL TURNO ---
+# resolve_turn non stampa nulla: emette tuple compatte (tipo, lato, ...) verso un sink.
+# Lato: PLAYER = squadra 1, AI = squadra 2. La formattazione dei messaggi resta ai sink,
+# quindi in simulazione (NullSink) non si paga né I/O né costruzione di stringhe.
+PLAYER = 1
+AI = 2
+
+EV_TURN = 0           # (EV_TURN, numero turno, attivo squadra 1, attivo squadra 2)
+EV_SWITCH = 1         # (EV_SWITCH, lato, vecchio, nuovo)
+EV_MOVE = 2           # (EV_MOVE, lato, attaccante, mossa)
+EV_MISS = 3           # (EV_MISS, lato, attaccante, mossa)
+EV_EFFECTIVENESS = 4  # (EV_EFFECTIVENESS, lato, moltiplicatore) solo se diverso da 1
+EV_HIT = 5            # (EV_HIT, lato, difensore, danno)
+EV_FAINT = 6          # (EV_FAINT, lato del Pokemon esausto, Pokemon)
+EV_SEND_OUT = 7       # (EV_SEND_OUT, lato, nuovo) cambio forzato dopo un KO
+EV_WIN = 8            # (EV_WIN, lato vincitore)
+
+class NullSink:
+    """Scarta tutto: resolve_turn salta anche la creazione degli eventi"""
+    enabled = False
+
+    def emit(self, event):
+        pass
+
+class ListSink:
+    """Accumula gli eventi in una lista (log della GUI, test, analisi)"""
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+class ConsoleSink:
+    """Stampa gli eventi con i messaggi della versione a riga di comando"""
+    enabled = True
+    ROLES = {PLAYER: "TU", AI: "AVVERSARIO"}
+
+    def emit(self, event):
+        kind = event[0]
+        if kind == EV_TURN:
+            _, turn, p1, p2 = event
+            print(f"\n=========================================")
+            print(f"               TURNO {turn}")
+            print(f"=========================================")
+            print(f"TUA SQUADRA: {p1.name} (HP: {p1.current_hp}/{p1.max_hp})")
+            print(f"AVVERSARIO:  {p2.name} (HP: {p2.current_hp}/{p2.max_hp})")
+            print("-" * 41)
+        elif kind == EV_SWITCH:
+            _, side, old_mon, new_mon = event
+            if side == PLAYER:
+                print(f">>> GIOCATORE richiama {old_mon.name}!")
+                print(f">>> Vai {new_mon.name}!")
+            else:
+                print(f">>> L'AVVERSARIO richiama {old_mon.name}!")
+                print(f">>> L'avversario manda in campo {new_mon.name}!")
+        elif kind == EV_MOVE:
+            print(f"\n[{self.ROLES[event[1]]}] {event[2].name} usa {event[3].name}!")
+        elif kind == EV_MISS:
+            print(f"\n[{self.ROLES[event[1]]}] {event[2].name} usa {event[3].name}, ma fallisce!")
+        elif kind == EV_EFFECTIVENESS:
+            eff = event[2]
+            if eff > 1.0: print(" -> È super efficace!")
+            elif eff == 0.0: print(" -> Non ha effetto...")
+            else: print(" -> Non è molto efficace...")
+        elif kind == EV_HIT:
+            print(f" -> {event[2].name} subisce {event[3]} danni.")
+        elif kind == EV_FAINT:
+            print(f" -> {event[2].name} è esausto!")
+        elif kind == EV_SEND_OUT:
+            if event[1] == PLAYER:
+                print(f"\n!!! Il tuo Pokémon è esausto. Mandi in campo {event[2].name}!")
+            else:
+                print(f"\n!!! Il Pokémon avversario è esausto. Entra {event[2].name}!")
+        elif kind == EV_WIN:
+            if event[1] == AI: print("\nNON HAI PIÙ POKÉMON! HAI PERSO!")
+            else: print("\nL'AVVERSARIO NON HA PIÙ POKÉMON! HAI VINTO!")
+
+NULL_SINK = NullSink()
+
 class Battle:
-    def __init__(self, team1, team2):
+    def __init__(self, team1, team2, rng=None):
         self.team1 = team1 
         self.team2 = team2 
         self.p1_active = team1[0]
         self.p2_active = team2[0]
         self.turn_count = 0
+        # RNG della battaglia (BattleRNG/BufferedRNG); None = modulo globale random
+        self.rng = rng
+        # Hash Zobrist della posizione (attivo solo dopo enable_hashing)
+        self.zobrist = None
+        self.hash = 0
 
     def get_next_pokemon(self, team):
         for p in team:
             if not p.is_fainted(): return p
         return None
 
+    def search_copy(self, rng=None):
+        """Copia profonda per ricerca/simulazione che non duplica l'RNG (niente copia dei buffer).
+        La copia usa `rng` se dato, altrimenti un RNG indipendente derivato dal seed della
+        battaglia e dal turno: la ricerca non consuma mai i tiri della partita vera."""
+        if rng is None:
+            rng = self.rng.fork(self.turn_count) if isinstance(self.rng, BattleRNG) else BattleRNG()
+        memo = {id(self.rng): rng} if self.rng is not None else {}
+        sim = copy.deepcopy(self, memo)
+        sim.rng = rng
+        return sim
+
+    # --- MAKE/UNMAKE PER LA RICERCA (nessuna copia della battaglia) ---
+
+    def enable_hashing(self, seed=0):
+        """Attiva l'hash Zobrist, aggiornato in modo incrementale da apply_turn/undo_turn"""
+        self.zobrist = ZobristKeys(self.team1, self.team2, seed)
+        self.hash = self.zobrist.compute_hash(self)
+
+    def apply_turn(self, ai_action, player_action, deterministic=False, timings=None):
+        """Applica in-place un turno simulato (stessa risoluzione di simulate_turn).
+        Ritorna il record da passare a undo_turn per annullarlo.
+        timings: dict opzionale (es. SearchStats.phase_ns) in cui sommare sotto "damage"
+        i ns spesi in calculate_damage."""
+        z = self.zobrist
+        undo = (self.p1_active, self.p2_active, [], self.hash)
+        hp_log = undo[2]
+
+        # 1. Risolvi Cambi
+        if ai_action[0] == "SWITCH":
+            new_mon = self.team2[ai_action[1]]
+            if z: self.hash ^= z.active[self.p2_active] ^ z.active[new_mon]
+            self.p2_active = new_mon
+        if player_action[0] == "SWITCH":
+            new_mon = self.team1[player_action[1]]
+            if z: self.hash ^= z.active[self.p1_active] ^ z.active[new_mon]
+            self.p1_active = new_mon
+
+        # 2. Risolvi Attacchi
+        p1 = self.p1_active
+        p2 = self.p2_active
+        attackers = []
+        if player_action[0] == "ATTACK" and not p1.is_fainted():
+            attackers.append((p1, p2, p1.moves[player_action[1]]))
+        if ai_action[0] == "ATTACK" and not p2.is_fainted():
+            attackers.append((p2, p1, p2.moves[ai_action[1]]))
+
+        attackers.sort(key=lambda x: x[0].speed, reverse=True)
+
+        for att, defe, move in attackers:
+            if att.is_fainted() or defe.is_fainted(): continue
+            if timings is None:
+                dmg, _ = calculate_damage(att, defe, move, deterministic, rng=self.rng)
+            else:
+                start = perf_counter_ns()
+                dmg, _ = calculate_damage(att, defe, move, deterministic, rng=self.rng)
+                timings["damage"] += perf_counter_ns() - start
+            old_hp = defe.current_hp
+            hp_log.append((defe, old_hp))
+            defe.take_damage(dmg)
+            if z: self.hash ^= z.hp[defe][old_hp] ^ z.hp[defe][defe.current_hp]
+
+        return undo
+
+    def undo_turn(self, undo):
+        """Ripristina HP, Pokemon attivi e hash registrati da apply_turn"""
+        p1_active, p2_active, hp_log, old_hash = undo
+        for mon, old_hp in reversed(hp_log):
+            mon.current_hp = old_hp
+        self.p1_active = p1_active
+        self.p2_active = p2_active
+        self.hash = old_hash
+
+    def to_state(self):
+        """Estrae lo stato compatto (tupla di 14 interi, hashable)"""
+        hp1 = [p.current_hp for p in self.team1] + [0] * (TEAM_SIZE - len(self.team1))
+        hp2 = [p.current_hp for p in self.team2] + [0] * (TEAM_SIZE - len(self.team2))
+        return tuple(hp1 + hp2 + [self.team1.index(self.p1_active), self.team2.index(self.p2_active)])
+
+    def load_state(self, state):
+        """Riscrive HP e Pokemon attivi a partire da uno stato compatto"""
+        for i, p in enumerate(self.team1):
+            p.current_hp = state[i]
+        for i, p in enumerate(self.team2):
+            p.current_hp = state[TEAM_SIZE + i]
+        self.p1_active = self.team1[state[P1_ACTIVE_SLOT]]
+        self.p2_active = self.team2[state[P2_ACTIVE_SLOT]]
+
     def play_turn(self, action_p1, action_p2):
-        # action_p1/p2: ["ATTACK", move_idx] oppure ["SWITCH", team_idx]
-        
+        """Turno della versione a riga di comando: stessa risoluzione, stampata a console"""
+        return self.resolve_turn(action_p1, action_p2, ConsoleSink())
+
+    def resolve_turn(self, action_p1, action_p2, sink=NULL_SINK):
+        """Unico punto di risoluzione di un turno reale (CLI, GUI, stress test).
+        action_p1/p2: ("ATTACK", move_idx) oppure ("SWITCH", team_idx).
+        Ritorna "CONTINUE", "AI_WINS" o "PLAYER_WINS"."""
+        emit = sink.emit if sink.enabled else None
         self.turn_count += 1
-        print(f"\n=========================================")
-        print(f"               TURNO {self.turn_count}")
-        print(f"=========================================")
-        
-        # LOG STATO CORRENTE
-        print(f"TUA SQUADRA: {self.p1_active.name} (HP: {self.p1_active.current_hp}/{self.p1_active.max_hp})")
-        print(f"AVVERSARIO:  {self.p2_active.name} (HP: {self.p2_active.current_hp}/{self.p2_active.max_hp})")
-        print("-" * 41)
+        if emit: emit((EV_TURN, self.turn_count, self.p1_active, self.p2_active))
 
+        # --- 1. GESTIONE SWITCH (Priorità assoluta) ---
         p1_switched = False
         p2_switched = False
 
-        # --- 1. GESTIONE SWITCH (Priorità assoluta) ---
-        
         if action_p1[0] == "SWITCH":
             idx = action_p1[1]
             if 0 <= idx < len(self.team1) and not self.team1[idx].is_fainted():
                 old_mon = self.p1_active
                 self.p1_active = self.team1[idx]
-                print(f">>> GIOCATORE richiama {old_mon.name}!")
-                print(f">>> Vai {self.p1_active.name}!")
+                if emit: emit((EV_SWITCH, PLAYER, old_mon, self.p1_active))
                 p1_switched = True
 
         if action_p2[0] == "SWITCH":
@@ -238,82 +863,100 @@ class Battle:
             if 0 <= idx < len(self.team2) and not self.team2[idx].is_fainted():
                 old_mon = self.p2_active
                 self.p2_active = self.team2[idx]
-                print(f">>> L'AVVERSARIO richiama {old_mon.name}!")
-                print(f">>> L'avversario manda in campo {self.p2_active.name}!")
+                if emit: emit((EV_SWITCH, AI, old_mon, self.p2_active))
                 p2_switched = True
 
-        if p1_switched and p2_switched:
-            return "CONTINUE"
-
         # --- 2. GESTIONE ATTACCHI ---
         order = []
-        
-        # Se P1 NON ha cambiato, attacca
-        if not p1_switched:
-            move = self.p1_active.moves[action_p1[1] % len(self.p1_active.moves)]
-            order.append((self.p1_active, self.p2_active, move, "TU"))
-            
-        # Se P2 NON ha cambiato, attacca
-        if not p2_switched:
-            move = self.p2_active.moves[action_p2[1] % len(self.p2_active.moves)]
-            # Il target è sempre il Pokemon ATTIVO corrente (che potrebbe essere appena entrato)
-            target = self.p1_active 
-            order.append((self.p2_active, target, move, "AVVERSARIO"))
+        if not p1_switched and action_p1[0] == "ATTACK" and self.p1_active.moves:
+            order.append((self.p1_active, self.p1_active.moves[action_p1[1] % len(self.p1_active.moves)], PLAYER))
+        if not p2_switched and action_p2[0] == "ATTACK" and self.p2_active.moves:
+            order.append((self.p2_active, self.p2_active.moves[action_p2[1] % len(self.p2_active.moves)], AI))
 
-        # Speed Check
+        # Speed Check (a parità decide la moneta)
         if len(order) == 2:
             if order[0][0].speed < order[1][0].speed:
                 order.reverse()
             elif order[0][0].speed == order[1][0].speed:
-                 if random.random() > 0.5: order.reverse()
+                if (self.rng or random).random() > 0.5: order.reverse()
 
-        # Esecuzione
-        for attacker, defender, move, role in order:
-            if attacker.is_fainted(): continue 
-            
-            # Recalcolo target dinamico (nel caso P1 attacchi per primo e uccida P2, o viceversa)
-            real_defender = self.p2_active if role == "TU" else self.p1_active
-            
-            if real_defender.is_fainted(): continue 
+        for attacker, move, side in order:
+            if attacker.is_fainted(): continue
+            # Il target è sempre il Pokemon ATTIVO corrente (che potrebbe essere appena entrato)
+            defender = self.p2_active if side == PLAYER else self.p1_active
+            if defender.is_fainted(): continue
 
-            print(f"\n[{role}] {attacker.name} usa {move.name}!")
-            dmg, eff = calculate_damage(attacker, real_defender, move)
-            
-            if eff > 1.0: print(" -> È super efficace!")
-            elif eff == 0.0: print(" -> Non ha effetto...")
-            elif eff < 1.0: print(" -> Non è molto efficace...")
-            
-            real_defender.take_damage(dmg)
-            print(f" -> {real_defender.name} subisce {dmg} danni.")
-            
-            if real_defender.is_fainted():
-                print(f" -> {real_defender.name} è esausto!")
+            dmg, eff = calculate_damage(attacker, defender, move, rng=self.rng)
+            if eff == -1.0:
+                if emit: emit((EV_MISS, side, attacker, move))
+                continue
+
+            defender.take_damage(dmg)
+            if emit:
+                emit((EV_MOVE, side, attacker, move))
+                if eff != 1.0: emit((EV_EFFECTIVENESS, side, eff))
+                emit((EV_HIT, side, defender, dmg))
+                if defender.is_fainted(): emit((EV_FAINT, AI if side == PLAYER else PLAYER, defender))
 
         # --- 3. CHECK FINE TURNO ---
-        
         if self.p1_active.is_fainted():
             new_p = self.get_next_pokemon(self.team1)
-            if new_p:
-                self.p1_active = new_p
-                print(f"\n!!! Il tuo Pokémon è esausto. Mandi in campo {new_p.name}!")
-            else:
-                print("\nNON HAI PIÙ POKÉMON! HAI PERSO!")
+            if not new_p:
+                if emit: emit((EV_WIN, AI))
                 return "AI_WINS"
+            self.p1_active = new_p
+            if emit: emit((EV_SEND_OUT, PLAYER, new_p))
 
         if self.p2_active.is_fainted():
             new_p = self.get_next_pokemon(self.team2)
-            if new_p:
-                self.p2_active = new_p
-                print(f"\n!!! Il Pokémon avversario è esausto. Entra {new_p.name}!")
-            else:
-                print("\nL'AVVERSARIO NON HA PIÙ POKÉMON! HAI VINTO!")
+            if not new_p:
+                if emit: emit((EV_WIN, PLAYER))
                 return "PLAYER_WINS"
+            self.p2_active = new_p
+            if emit: emit((EV_SEND_OUT, AI, new_p))
 
         return "CONTINUE"
 
-# --- 3. MAIN INTERATTIVO ---
+# --- 3. STATO COMPATTO ---
+# Layout fisso di 14 interi: [0..5] HP squadra 1, [6..11] HP squadra 2,
+# [12] indice attivo squadra 1, [13] indice attivo squadra 2.
+# Le regole del turno restano solo in Battle: lo stato compatto serve a identificare una
+# posizione (chiave della GUI) e a spedirla ai worker della radice parallela, che la
+# caricano con load_state su una battaglia già costruita (specie e chiavi Zobrist).
+
+TEAM_SIZE = 6
+P1_ACTIVE_SLOT = 2 * TEAM_SIZE
+P2_ACTIVE_SLOT = 2 * TEAM_SIZE + 1
+
+class ZobristKeys:
+    """Chiavi casuali a 64 bit per slot: una per ogni valore di HP e una per "è in campo".
+    Le chiavi dipendono solo da seed e posizione nella squadra, quindi copie della stessa
+    battaglia (una per decisione) producono lo stesso hash per la stessa posizione."""
+    def __init__(self, team1, team2, seed=0):
+        self.hp = {}
+        self.active = {}
+        for side, team in enumerate((team1, team2)):
+            for i, mon in enumerate(team):
+                rng = random.Random(seed * 1000 + side * TEAM_SIZE + i)
+                self.active[mon] = rng.getrandbits(64)
+                self.hp[mon] = [rng.getrandbits(64) for _ in range(mon.max_hp + 1)]
+        # Le specie entrano nella chiave: squadre diverse -> hash diversi
+        self.base = hash(tuple(mon.id for mon in list(team1) + list(team2)))
+
+    def compute_hash(self, battle):
+        h = self.base ^ self.active[battle.p1_active] ^ self.active[battle.p2_active]
+        for mon in battle.team1 + battle.team2:
+            h ^= self.hp[mon][mon.current_hp]
+        return h
+
+# --- 4. MAIN INTERATTIVO ---
 
 if __name__ == "__main__":
+    if "--build-snapshot" in sys.argv:
+        data = build_snapshot()
+        print(f"📦 {SNAPSHOT_FILE} v{SNAPSHOT_VERSION}: {len(data['moves'])} mosse, {len(data['pokedex'])} Pokemon")
+        sys.exit()
+
     print("\n*******************************************")
     print("* POKEMON BATTLE SIMULATOR 1.0       *")
     print("*******************************************")
@@ -326,8 +969,8 @@ if __name__ == "__main__":
         exit()
     
     # Squadre casuali
-    player_team = copy.deepcopy(random.sample(pokedex, 6))
-    ai_team = copy.deepcopy(random.sample(pokedex, 6))
+    player_team = make_team(random.sample(pokedex, 6))
+    ai_team = make_team(random.sample(pokedex, 6))
     
     # --- STAMPA INIZIALE SQUADRE (Quella che ti piaceva!) ---
     print("\n[LA TUA SQUADRA]")
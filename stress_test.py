@@ -1,14 +1,20 @@
+import argparse
+import math
 import random
 import copy
 import os
 import time
 import csv
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 
-from pokemon_engine import load_moves, load_gen1_pokemon, Battle, calculate_damage
-from ai_minimax import get_best_action_minimax
+from pokemon_engine import (load_moves, Pokedex, Battle, calculate_damage, DAMAGE_CACHE,
+                            make_rng, make_team, PLAYER, AI, EV_MISS)
+from ai_minimax import get_best_action_minimax, search_iterative, TranspositionTable, SearchStats
+from ai_mcts import get_best_action_mcts
 
 # --- 1. DEFINIZIONE IA GREEDY ---
-def get_best_action_greedy(battle):
+def get_best_action_greedy(battle, deterministic=False):
     p1 = battle.p1_active 
     p2 = battle.p2_active 
     best_move_idx = 0
@@ -16,7 +22,7 @@ def get_best_action_greedy(battle):
     
     if p2.moves:
         for i, move in enumerate(p2.moves):
-            dmg, _ = calculate_damage(p2, p1, move)
+            dmg, _ = calculate_damage(p2, p1, move, deterministic, rng=battle.rng)
             if dmg > max_dmg:
                 max_dmg = dmg
                 best_move_idx = i
@@ -27,7 +33,7 @@ def get_best_action_greedy(battle):
         for i, bench_mon in enumerate(battle.team2):
             if bench_mon != p2 and not bench_mon.is_fainted():
                 for move in bench_mon.moves:
-                    b_dmg, _ = calculate_damage(bench_mon, p1, move)
+                    b_dmg, _ = calculate_damage(bench_mon, p1, move, deterministic, rng=battle.rng)
                     if b_dmg > best_bench_dmg:
                         best_bench_dmg = b_dmg
                         best_bench_idx = i
@@ -39,163 +45,429 @@ def get_best_action_greedy(battle):
 
 # --- 2. FUNZIONE PER CREARE SQUADRE FISSE ---
 def build_specific_team(pokedex, pokemon_names):
-    team = []
-    for name in pokemon_names:
-        for p in pokedex:
-            if p.name == name:
-                team.append(copy.deepcopy(p))
-                break
-    return team
+    # pokedex è un Pokedex: ricerca per nome O(1), si creano solo le specie richieste
+    return [pokedex[name] for name in pokemon_names if name in pokedex]
 
 # --- 3. CONFIGURAZIONE DEL TEST ---
 MATCHES_PER_TEAM = 10
 MINIMAX_DEPTH = 2     
+MINIMAX_TT_ENTRIES = 1 << 18   # voci della tabella di trasposizione (una per partita)
+MINIMAX_BUDGET_MS = None       # es. 200: ricerca iterativa a tempo, MINIMAX_DEPTH diventa il massimo
+MINIMAX_WORKERS = 1            # >1: azioni alla radice valutate in parallelo su più core
+MCTS_BUDGET_MS = None          # es. 200: l'IA 2 usa MCTS al posto del Minimax (colonne Minimax_* invariate)
+MINIMAX_STATS = False          # True (o --stats): colonne Minimax_Avg_Nodes, ..._Avg_Eval_ms; rallenta le latenze
+RNG_BUFFERED = True            # tiri dei colpi pescati a blocchi da NumPy (se installato)
 OUTPUT_FILE = 'stress_test_results.csv'
+TIMINGS_FILE = 'stress_test_timings.csv'   # una riga per decisione (tempi in ns)
+RESULT_FIELDS = ["Game_ID", "Team_Type", "Winner", "Turns", "Greedy_Avg_Time_s", "Minimax_Avg_Time_s",
+                 "Greedy_P99_Time_ms", "Minimax_P99_Time_ms", "Greedy_Max_Time_ms", "Minimax_Max_Time_ms",
+                 "Greedy_Switches", "Minimax_Switches", "Greedy_Misses", "Minimax_Misses",
+                 "Minimax_TT_Hit_Rate", "Minimax_Avg_Depth", "Seed"]
+TIMING_FIELDS = ["Game_ID", "Turn", "AI", "Time_ns", "Mons_Left", "Opp_Mons_Left", "Total_Mons_Left", "Depth"]
 
 # Definiamo le due squadre per il test
 TEAM_1_NAMES = ["Charizard", "Alakazam", "Gengar", "Jolteon", "Machamp", "Aerodactyl"] # Offensivo
 TEAM_2_NAMES = ["Snorlax", "Lapras", "Venusaur", "Slowbro", "Muk", "Clefable"]         # Difensivo
 
-def run_stress_test():
-    total_games = MATCHES_PER_TEAM * 2
-    print(f"🔄 Avvio Stress Test: {total_games} Partite (Mirror Match)")
-    print(f"🧠 IA 1 (Greedy) vs IA 2 (Minimax Depth {MINIMAX_DEPTH})")
-    print("-" * 50)
-    
+# --- 4. SEED E SQUADRE PER PROCESSO ---
+# Ogni processo ricarica il Pokedex con lo stesso seed (i moveset sono casuali), quindi
+# tutti i worker giocano con squadre identiche. Ogni partita ha poi un RNG proprio,
+# derivato da (seed base, Game_ID): il risultato non dipende da quale worker la gioca.
+_TEAMS = None
+
+def derive_seed(base_seed, game_id):
+    """Seed a 32 bit della singola partita, stabile tra processi ed esecuzioni"""
+    return random.Random(f"{base_seed}:{game_id}").getrandbits(32)
+
+def _init_worker(base_seed, minimax_stats=None):
+    global _TEAMS, MINIMAX_STATS
+    if minimax_stats is not None:
+        MINIMAX_STATS = minimax_stats   # con spawn i worker non vedono le modifiche di __main__
     moves_db = load_moves('moves.json')
-    pokedex = load_gen1_pokemon('pokedex.json', moves_db)
-    
-    # Costruiamo i team dal Pokedex
-    team_offensive = build_specific_team(pokedex, TEAM_1_NAMES)
-    team_defensive = build_specific_team(pokedex, TEAM_2_NAMES)
-    
-    scenarios = [
-        {"nome": "Offensivo", "team": team_offensive},
-        {"nome": "Difensivo", "team": team_defensive}
-    ]
-    
-    all_results = []
-    game_counter = 1
-
-    # --- CICLO SUI DUE SCENARI (SQUADRE) ---
-    for scenario in scenarios:
-        team_type = scenario["nome"]
-        base_team = scenario["team"]
-        print(f"\n⚔️ INIZIO TEST SCENARIO: TEAM {team_type.upper()}")
+    pokedex = Pokedex(moves_db, rng=random.Random(base_seed))
+    _TEAMS = {
+        "Offensivo": build_specific_team(pokedex, TEAM_1_NAMES),
+        "Difensivo": build_specific_team(pokedex, TEAM_2_NAMES),
+    }
+
+def build_game_specs(games, base_seed):
+    """Genera (Game_ID, squadra, seed): prima metà squadra offensiva, seconda metà difensiva"""
+    half = (games + 1) // 2
+    return ((game_id, "Offensivo" if game_id <= half else "Difensivo", derive_seed(base_seed, game_id))
+            for game_id in range(1, games + 1))
+
+# --- 5. SINGOLA PARTITA ---
+def percentile(values, q):
+    """Percentile q (0-100) con il metodo nearest-rank; 0 se non ci sono valori"""
+    if not values: return 0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def mons_left(team):
+    return sum(1 for p in team if not p.is_fainted())
+
+class MissCounter:
+    """Sink degli eventi che conta solo le mosse fallite per lato"""
+    enabled = True
+
+    def __init__(self):
+        self.counts = {PLAYER: 0, AI: 0}
+
+    def emit(self, event):
+        if event[0] == EV_MISS:
+            self.counts[event[1]] += 1
+
+def play_game(spec):
+    game_id, team_type, game_seed = spec
+    rng = make_rng(game_seed, RNG_BUFFERED)
+    base_team = _TEAMS[team_type]
+
+    # Squadre fresche per ogni partita: solo nuovi HP, le specie sono condivise
+    team_greedy = make_team(base_team)
+    team_minimax = make_team(base_team)
+
+    battle = Battle(team_greedy, team_minimax, rng)
+    # La Greedy tira i danni con un RNG suo, derivato dal seed della partita:
+    # le sue decisioni non consumano i tiri della battaglia
+    greedy_rng = rng.fork("greedy")
+    tt = TranspositionTable(MINIMAX_TT_ENTRIES)
+
+    turns = 0
+    greedy_times = []     # ns per decisione (perf_counter_ns: monotono, alta risoluzione)
+    minimax_times = []
+    timings = []          # righe di TIMINGS_FILE
+    minimax_depths = []
+    greedy_switches = 0
+    minimax_switches = 0
+    misses = MissCounter()
+    # Contatori della cache danni di questo processo: a fine partita si tiene la differenza
+    cache_hits, cache_misses = DAMAGE_CACHE.hits, DAMAGE_CACHE.misses
+    search_stats = SearchStats() if MINIMAX_STATS and MCTS_BUDGET_MS is None else None
+
+    game_over = False
+    winner = None
+
+    # --- LOOP DELLA BATTAGLIA ---
+    while not game_over:
+        turns += 1
+        greedy_left = mons_left(battle.team1)
+        minimax_left = mons_left(battle.team2)
         
-        # --- CICLO SULLE 10 PARTITE PER SQUADRA ---
-        for i in range(MATCHES_PER_TEAM):
-            print(f"  -> Partita {game_counter}/{total_games} in corso... (Team {team_type})", end="\r")
-            
-            # Ricreiamo copie fresche dei team per ogni partita
-            team_greedy = copy.deepcopy(base_team)
-            team_minimax = copy.deepcopy(base_team)
-            
-            battle = Battle(team_greedy, team_minimax)
-            
-            turns = 0
-            greedy_times = []
-            minimax_times = []
-            greedy_switches = 0
-            minimax_switches = 0
-            greedy_misses = 0
-            minimax_misses = 0
-            
-            game_over = False
-            winner = None
+        # 1. SCELTA GREEDY
+        start_time = time.perf_counter_ns()
+        battle_copy = copy.copy(battle)
+        battle_copy.p1_active = battle.p2_active
+        battle_copy.p2_active = battle.p1_active
+        battle_copy.team2 = battle.team1
+        battle_copy.rng = greedy_rng
+        
+        action_greedy = get_best_action_greedy(battle_copy)
+        greedy_times.append(time.perf_counter_ns() - start_time)
+        if action_greedy[0] == "SWITCH": greedy_switches += 1
 
-            # --- LOOP DELLA BATTAGLIA ---
-            while not game_over:
-                turns += 1
-                
-                # 1. SCELTA GREEDY
-                start_time = time.time()
-                battle_copy = copy.copy(battle)
-                battle_copy.p1_active = battle.p2_active
-                battle_copy.p2_active = battle.p1_active
-                battle_copy.team2 = battle.team1
-                
-                action_greedy = get_best_action_greedy(battle_copy)
-                greedy_times.append(time.time() - start_time)
-                if action_greedy[0] == "SWITCH": greedy_switches += 1
-
-                # 2. SCELTA MINIMAX
-                start_time = time.time()
-                action_minimax = get_best_action_minimax(battle, depth=MINIMAX_DEPTH)
-                minimax_times.append(time.time() - start_time)
-                if action_minimax[0] == "SWITCH": minimax_switches += 1
-                
-                # 3. RISOLUZIONE
-                if action_greedy[0] == "SWITCH":
-                    battle.p1_active = battle.team1[action_greedy[1]]
-                if action_minimax[0] == "SWITCH":
-                    battle.p2_active = battle.team2[action_minimax[1]]
-                    
-                attackers = []
-                if action_greedy[0] == "ATTACK" and not battle.p1_active.is_fainted():
-                    attackers.append((battle.p1_active, battle.p2_active, battle.p1_active.moves[action_greedy[1]], "Greedy"))
-                if action_minimax[0] == "ATTACK" and not battle.p2_active.is_fainted():
-                    attackers.append((battle.p2_active, battle.p1_active, battle.p2_active.moves[action_minimax[1]], "Minimax"))
-                    
-                attackers.sort(key=lambda x: x[0].speed, reverse=True)
-                
-                for att, defe, move, who in attackers:
-                    if att.is_fainted() or defe.is_fainted(): continue
-                    dmg, eff = calculate_damage(att, defe, move)
-                    
-                    if eff == -1.0:
-                        if who == "Greedy": greedy_misses += 1
-                        else: minimax_misses += 1
-                        continue
-                    defe.take_damage(dmg)
-
-                # 4. GESTIONE KO
-                if battle.p1_active.is_fainted():
-                    next_p = battle.get_next_pokemon(battle.team1)
-                    if next_p: battle.p1_active = next_p
-                    else:
-                        winner = "Minimax"
-                        game_over = True
-
-                if battle.p2_active.is_fainted() and not game_over:
-                    next_p = battle.get_next_pokemon(battle.team2)
-                    if next_p: battle.p2_active = next_p
-                    else:
-                        winner = "Greedy"
-                        game_over = True
-                        
-                # Anti-Stallo
-                if turns > 150:
-                    winner = "Draw"
-                    game_over = True
-
-            # SALVATAGGIO STATISTICHE
-            avg_greedy_time = sum(greedy_times) / len(greedy_times) if greedy_times else 0
-            avg_minimax_time = sum(minimax_times) / len(minimax_times) if minimax_times else 0
-            
-            all_results.append({
-                "Game_ID": game_counter,
-                "Team_Type": team_type, # <-- NUOVO: Tracciamo che squadra stavano usando!
-                "Winner": winner,
-                "Turns": turns,
-                "Greedy_Avg_Time_s": round(avg_greedy_time, 5),
-                "Minimax_Avg_Time_s": round(avg_minimax_time, 5),
-                "Greedy_Switches": greedy_switches,
-                "Minimax_Switches": minimax_switches,
-                "Greedy_Misses": greedy_misses,
-                "Minimax_Misses": minimax_misses
-            })
-            game_counter += 1
-
-    # --- ESPORTAZIONE CSV ---
-    print("\n✅ Simulazione completata! Salvataggio dati in corso...")
-    keys = all_results[0].keys()
-    with open(OUTPUT_FILE, 'w', newline='') as output_file:
-        dict_writer = csv.DictWriter(output_file, fieldnames=keys)
-        dict_writer.writeheader()
-        dict_writer.writerows(all_results)
+        # 2. SCELTA MINIMAX
+        start_time = time.perf_counter_ns()
+        if MCTS_BUDGET_MS is not None:
+            action_minimax = get_best_action_mcts(battle, budget_ms=MCTS_BUDGET_MS)
+            minimax_depths.append(0)
+        elif MINIMAX_BUDGET_MS is None:
+            result = get_best_action_minimax(battle, depth=MINIMAX_DEPTH, tt=tt, workers=MINIMAX_WORKERS,
+                                             stats=search_stats is not None)
+            if search_stats is not None:
+                action_minimax, decision_stats = result
+                search_stats.add(decision_stats)
+            else:
+                action_minimax = result
+            minimax_depths.append(MINIMAX_DEPTH)
+        else:
+            result = search_iterative(battle, MINIMAX_BUDGET_MS, MINIMAX_DEPTH, tt=tt,
+                                      workers=MINIMAX_WORKERS, stats=search_stats is not None)
+            action_minimax, reached = result[0], result[1]
+            if search_stats is not None:
+                search_stats.add(result[2])
+            minimax_depths.append(reached)
+        minimax_times.append(time.perf_counter_ns() - start_time)
+        total_left = greedy_left + minimax_left
+        timings.append((game_id, turns, "Greedy", greedy_times[-1], greedy_left, minimax_left, total_left, 0))
+        timings.append((game_id, turns, "Minimax", minimax_times[-1], minimax_left, greedy_left, total_left,
+                        minimax_depths[-1]))
+        if action_minimax[0] == "SWITCH": minimax_switches += 1
         
-    print(f"📊 Dati salvati con successo in: {OUTPUT_FILE}")
+        # 3. RISOLUZIONE (stesso motore della CLI e della GUI, senza output)
+        outcome = battle.resolve_turn(action_greedy, action_minimax, misses)
+        if outcome == "AI_WINS":
+            winner = "Minimax"
+            game_over = True
+        elif outcome == "PLAYER_WINS":
+            winner = "Greedy"
+            game_over = True
+
+        # Anti-Stallo
+        if turns > 150:
+            winner = "Draw"
+            game_over = True
+
+    # SALVATAGGIO STATISTICHE
+    avg_greedy_time = sum(greedy_times) / len(greedy_times) / 1e9 if greedy_times else 0
+    avg_minimax_time = sum(minimax_times) / len(minimax_times) / 1e9 if minimax_times else 0
+    
+    row = {
+        "Game_ID": game_id,
+        "Team_Type": team_type, # <-- NUOVO: Tracciamo che squadra stavano usando!
+        "Winner": winner,
+        "Turns": turns,
+        "Greedy_Avg_Time_s": round(avg_greedy_time, 7),
+        "Minimax_Avg_Time_s": round(avg_minimax_time, 7),
+        "Greedy_P99_Time_ms": round(percentile(greedy_times, 99) / 1e6, 4),
+        "Minimax_P99_Time_ms": round(percentile(minimax_times, 99) / 1e6, 4),
+        "Greedy_Max_Time_ms": round(max(greedy_times, default=0) / 1e6, 4),
+        "Minimax_Max_Time_ms": round(max(minimax_times, default=0) / 1e6, 4),
+        "Greedy_Switches": greedy_switches,
+        "Minimax_Switches": minimax_switches,
+        "Greedy_Misses": misses.counts[PLAYER],
+        "Minimax_Misses": misses.counts[AI],
+        "Minimax_TT_Hit_Rate": round(tt.hit_rate(), 4),
+        "Minimax_Avg_Depth": round(sum(minimax_depths) / len(minimax_depths), 2) if minimax_depths else 0,
+        "Seed": game_seed
+    }
+    if search_stats is not None:
+        row.update(search_stats.as_row("Minimax_"))
+    cache = (DAMAGE_CACHE.hits - cache_hits, DAMAGE_CACHE.misses - cache_misses)
+    return row, timings, cache
+
+def result_fields():
+    """Colonne del CSV dei risultati con la configurazione corrente"""
+    fields = list(RESULT_FIELDS)
+    if MINIMAX_STATS and MCTS_BUDGET_MS is None:
+        fields.extend(SearchStats().as_row("Minimax_"))
+    return fields
+
+# --- 6. SCRITTURA INCREMENTALE E RIPRESA ---
+# Ogni partita finita va subito su disco (in append, flush ogni FLUSH_EVERY partite):
+# un'esecuzione interrotta perde al massimo le ultime partite e con --resume riparte
+# saltando i Game_ID già presenti nel CSV. In memoria restano solo contatori e le poche
+# partite finite fuori ordine in attesa di quelle precedenti.
+FLUSH_EVERY = 10
+PENDING_PER_WORKER = 8    # partite in coda (in corso o in attesa di scrittura) per worker
+
+class ResumeError(ValueError):
+    """Il CSV esistente non si può riprendere con questa configurazione"""
+    pass
+
+class LatencyHistogram:
+    """Tempi in ns su bucket logaritmici (larghezza 5%): percentili con memoria costante"""
+    RATIO = 1.05
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    def add(self, ns):
+        bucket = int(math.log(max(ns, 1), self.RATIO))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.max = max(self.max, ns)
+
+    def percentile(self, q):
+        """Limite superiore del bucket che contiene il percentile q (nearest-rank)"""
+        if not self.total: return 0
+        rank = max(1, math.ceil(q / 100 * self.total))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.max, self.RATIO ** (bucket + 1))
+        return self.max
+
+def _repair_tail(path):
+    """Tronca un'eventuale ultima riga scritta a metà (interruzione durante la scrittura)"""
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0: return
+        f.seek(size - 1)
+        if f.read(1) == b"\n": return
+        # Si torna indietro a blocchi fino all'ultimo a capo
+        pos = size
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                f.truncate(pos + newline + 1)
+                return
+        f.truncate(0)
+
+def load_completed(path, games, base_seed, fields):
+    """Game_ID già completati in un CSV dei risultati esistente (vuoto: nessuno).
+    L'intestazione deve essere `fields` (stesse colonne che scriverebbe questa esecuzione)
+    e ogni partita deve coincidere con quella di build_game_specs(games, base_seed): stesso
+    seed e stessa squadra (che dipende anche dal numero di partite). Altrimenti la ripresa
+    mescolerebbe due esecuzioni diverse: ResumeError prima di giocare."""
+    _repair_tail(path)
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None:
+            return set()
+        if "Seed" not in reader.fieldnames or "Game_ID" not in reader.fieldnames:
+            raise ResumeError(f"{path} non ha le colonne Game_ID/Seed: è di una versione precedente, "
+                              "non si può riprendere")
+        if reader.fieldnames != fields:
+            missing = [c for c in fields if c not in reader.fieldnames]
+            extra = [c for c in reader.fieldnames if c not in fields]
+            raise ResumeError(f"{path} ha colonne diverse da questa configurazione "
+                              f"(mancano {missing}, in più {extra}): controlla MINIMAX_STATS/MCTS_BUDGET_MS")
+        specs = {game_id: (team_type, game_seed)
+                 for game_id, team_type, game_seed in build_game_specs(games, base_seed)}
+        completed = set()
+        for row in reader:
+            game_id = int(row["Game_ID"])
+            if game_id not in specs:
+                raise ResumeError(f"{path}: la partita {game_id} è fuori dalle {games} partite richieste")
+            team_type, game_seed = specs[game_id]
+            if int(row["Seed"]) != game_seed:
+                raise ResumeError(f"{path}: la partita {game_id} non viene dal seed {base_seed}")
+            if row["Team_Type"] != team_type:
+                raise ResumeError(f"{path}: la partita {game_id} ha usato la squadra {row['Team_Type']} invece di "
+                                  f"{team_type}: l'esecuzione interrotta aveva un altro --games")
+            completed.add(game_id)
+        return completed
+
+def _trim_timings(path, completed):
+    """Toglie dal file dei tempi le righe delle partite senza risultato (verranno rigiocate)"""
+    _repair_tail(path)
+    tmp_path = path + ".tmp"
+    with open(path, newline='') as src, open(tmp_path, 'w', newline='') as dst:
+        reader = csv.reader(src)
+        writer = csv.writer(dst)
+        writer.writerow(next(reader, TIMING_FIELDS))
+        for row in reader:
+            if int(row[0]) in completed:
+                writer.writerow(row)
+    os.replace(tmp_path, path)
+
+# --- 7. ESECUZIONE (SERIALE O SU PIÙ PROCESSI) ---
+def run_stress_test(games=MATCHES_PER_TEAM * 2, workers=1, seed=None, resume=False):
+    if seed is None:
+        if resume:
+            raise ResumeError("--resume richiede lo stesso --seed dell'esecuzione interrotta")
+        seed = random.SystemRandom().getrandbits(32)
+    print(f"🔄 Avvio Stress Test: {games} Partite (Mirror Match), seed {seed}, {workers} worker")
+    if MCTS_BUDGET_MS is not None:
+        print(f"🧠 IA 1 (Greedy) vs IA 2 (MCTS {MCTS_BUDGET_MS} ms)")
+    elif MINIMAX_BUDGET_MS is None:
+        print(f"🧠 IA 1 (Greedy) vs IA 2 (Minimax Depth {MINIMAX_DEPTH})")
+    else:
+        print(f"🧠 IA 1 (Greedy) vs IA 2 (Minimax {MINIMAX_BUDGET_MS} ms, Depth max {MINIMAX_DEPTH})")
+    print("-" * 50)
+
+    fields = result_fields()
+    completed = set()
+    resume = resume and os.path.exists(OUTPUT_FILE)
+    write_header = True
+    if resume:
+        completed = load_completed(OUTPUT_FILE, games, seed, fields)
+        write_header = os.path.getsize(OUTPUT_FILE) == 0
+        if os.path.exists(TIMINGS_FILE):
+            _trim_timings(TIMINGS_FILE, completed)
+        print(f"⏩ Ripresa: {len(completed)} partite già in {OUTPUT_FILE}")
+
+    specs = (spec for spec in build_game_specs(games, seed) if spec[0] not in completed)
+    todo = games - sum(1 for game_id in completed if game_id <= games)
+    latencies = {"Greedy": LatencyHistogram(), "Minimax": LatencyHistogram()}
+    cache_counts = [0, 0]    # hit/miss della cache danni sommati su tutte le partite (e processi)
+    mode = 'a' if resume else 'w'
+    timings_new = not (resume and os.path.exists(TIMINGS_FILE))
+
+    # Risultati e tempi vanno su file man mano che le partite finiscono (in ordine di Game_ID)
+    with open(OUTPUT_FILE, mode, newline='') as output_file, \
+         open(TIMINGS_FILE, 'a' if not timings_new else 'w', newline='') as timings_file:
+        timings_writer = csv.writer(timings_file)
+        if timings_new:
+            timings_writer.writerow(TIMING_FIELDS)
+        dict_writer = csv.DictWriter(output_file, fieldnames=fields)
+        if write_header:
+            dict_writer.writeheader()
+        written = 0
+
+        def collect(result):
+            nonlocal written
+            row, timings, (hits, misses) = result
+            cache_counts[0] += hits
+            cache_counts[1] += misses
+            # I tempi arrivano al sistema operativo prima che esista la riga del risultato:
+            # una partita con la riga ha sempre anche i tempi, una senza riga viene rigiocata
+            # e i suoi tempi tolti da _trim_timings
+            timings_writer.writerows(timings)
+            timings_file.flush()
+            dict_writer.writerow(row)
+            for timing in timings:
+                latencies[timing[2]].add(timing[3])
+            written += 1
+            if written % FLUSH_EVERY == 0:
+                output_file.flush()
+
+        if workers <= 1:
+            _init_worker(seed)
+            for done, spec in enumerate(specs, 1):
+                print(f"  -> Partita {spec[0]}/{games} in corso... ({done}/{todo}, Team {spec[1]})", end="\r")
+                collect(play_game(spec))
+        else:
+            # Coda limitata: al massimo `limit` partite tra in corso e finite in attesa di
+            # essere scritte. Ogni partita finita libera subito un posto (nessuna barriera),
+            # i risultati escono in ordine di Game_ID
+            limit = workers * PENDING_PER_WORKER
+            order = deque()      # Game_ID inviati e non ancora scritti, in ordine
+            running = {}         # future -> Game_ID
+            ready = {}           # Game_ID -> risultato finito fuori ordine
+            done = 0
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(seed, MINIMAX_STATS)) as pool:
+                while True:
+                    while len(order) < limit:
+                        spec = next(specs, None)
+                        if spec is None: break
+                        running[pool.submit(play_game, spec)] = spec[0]
+                        order.append(spec[0])
+                    if not running: break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        ready[running.pop(future)] = future.result()
+                    while order and order[0] in ready:
+                        collect(ready.pop(order.popleft()))
+                        done += 1
+                        print(f"  -> Partite completate {done}/{todo}", end="\r")
+
+    print("\n✅ Simulazione completata!")
+    print(f"📊 Dati salvati con successo in: {OUTPUT_FILE} (tempi per decisione in {TIMINGS_FILE})")
+    for ai_name, histogram in latencies.items():
+        p50, p90, p99 = (histogram.percentile(q) / 1e6 for q in (50, 90, 99))
+        print(f"⏱️ {ai_name}: p50 {p50:.3f} ms | p90 {p90:.3f} ms | p99 {p99:.3f} ms | "
+              f"max {histogram.max / 1e6:.3f} ms (solo partite di questa esecuzione)")
+    if MINIMAX_STATS:
+        print("⚠️ Statistiche di ricerca attive: le latenze del Minimax includono la strumentazione")
+    hits, misses = cache_counts
+    hit_rate = hits / (hits + misses) if hits + misses else 0.0
+    print(f"🗃️ Cache danni: {hits} hit / {misses} miss (hit rate {hit_rate:.1%})")
 
 if __name__ == "__main__":
-    run_stress_test()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Stress test Greedy vs Minimax/MCTS")
+    parser.add_argument("--games", type=int, default=MATCHES_PER_TEAM * 2, help="numero totale di partite")
+    parser.add_argument("--workers", type=int, default=1, help="processi in parallelo (0 = tutti i core)")
+    parser.add_argument("--seed", type=int, default=None, help="seed base per risultati riproducibili")
+    parser.add_argument("--stats", action="store_true",
+                        help="statistiche di ricerca del Minimax nel CSV (le latenze misurate includono l'overhead)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continua un'esecuzione interrotta (stesso --seed): salta i Game_ID già nel CSV")
+    args = parser.parse_args()
+    if args.resume and args.seed is None:
+        parser.error("--resume richiede lo stesso --seed dell'esecuzione interrotta")
+    if args.stats:
+        MINIMAX_STATS = True
+    try:
+        run_stress_test(args.games, args.workers or os.cpu_count() or 1, args.seed, args.resume)
+    except ResumeError as exc:
+        parser.error(str(exc))